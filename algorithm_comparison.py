@@ -1,9 +1,16 @@
 import pygame
 import sort_algos
 import numpy as np
+import functools
 import time
 import threading
+import parallel_sorts
+import workloads
 from collections import defaultdict
+from op_counts import OpCounts, counted
+from process_runner import ProcessRace
+from timing_series import TimingSeries
+import trace_cache
 
 class ComparisonMode:
     def __init__(self, width, height):
@@ -27,37 +34,48 @@ class ComparisonMode:
             'Bubble Sort': self.RED,
             'Insertion Sort': self.GREEN,
             'Merge Sort': self.BLUE,
+            'Tim Sort': (0, 90, 200),
             'Quick Sort': self.YELLOW,
+            'Intro Sort': (180, 180, 0),
             'Heap Sort': self.PURPLE,
+            'Floyd Heap Sort': (190, 90, 190),
             'Radix Sort': self.ORANGE,
+            'MSD Radix Sort': (230, 130, 60),
             'Bucket Sort': self.CYAN,
             'Selection Sort': self.PINK,
-            'Counting Sort': (255, 100, 100)  # Light red
+            'Counting Sort': (255, 100, 100),  # Light red
+            'NumPy Radix Sort': (200, 120, 0),
+            'NumPy Counting Sort': (0, 160, 160),
+            'Parallel Merge Sort': (70, 70, 160),
+            'Sample Sort': (120, 60, 20)
         }
         
         self.FONT = pygame.font.SysFont('comicsans', 16)
         self.LARGE_FONT = pygame.font.SysFont('comicsans', 24)
         self.SMALL_FONT = pygame.font.SysFont('comicsans', 12)
         
-        self.algorithms = {
-            'Bubble Sort': sort_algos.bubble_sort,
-            'Insertion Sort': sort_algos.insertion_sort,
-            'Merge Sort': sort_algos.merge_sort,
-            'Quick Sort': sort_algos.quick_sort,
-            'Heap Sort': sort_algos.heap_sort,
-            'Radix Sort': sort_algos.radix_sort,
-            'Bucket Sort': sort_algos.bucket_sort,
-            'Selection Sort': sort_algos.selection_sort,
-            'Counting Sort': sort_algos.counting_sort
-        }
+        self.algorithms = dict(sort_algos.VISUAL_SORTS)
+        self.raw_algorithms = dict(sort_algos.RAW_SORTS)
+        self.raw_algorithms.update(parallel_sorts.PARALLEL_SORTS)
+        self.workers = parallel_sorts.DEFAULT_WORKERS  # [/] set the parallel engines' worker count
+        self.use_raw = False  # K toggles timing the plain kernels instead of the generators
+        self.backend = 'process'  # P toggles between 'process' and 'thread'
+        self.count_ops = False  # O toggles live compare/swap/write counts
+        self.op_counts = {}
+        self.race = None
+        self.cache = trace_cache.get_cache()  # finished runs are not raced again on the same array
+        self.cache_keys = {}
+        self.cached_algorithms = set()
         
         # State : Start at array size 50 with 0-1000 ranged
         self.array_size = 50  
         self.min_val = 0
         self.max_val = 1000
+        self.workload = 'uniform'  # W cycles through workloads.WORKLOAD_NAMES
         self.running = False
         self.completed_algorithms = set()
-        self.timing_data = defaultdict(list)
+        self.timing_data = defaultdict(TimingSeries)
+        self.chart_surface = None  # static chart frame, axes and labels
         self.current_times = {}  
         self.start_time = 0
         
@@ -65,16 +83,47 @@ class ComparisonMode:
         self.reset_array()
         
     def reset_array(self):
-        self.lst = np.random.randint(low=self.min_val, high=self.max_val + 1, size=self.array_size).tolist()
+        # One list shared read-only by every racer; the kernels copy their input,
+        # so no per-thread copies are needed. Arrays here are at most 3000
+        # elements, too small for compact storage to pay for its slower reads
+        self.lst = workloads.make(self.workload, self.array_size, self.min_val, self.max_val)
+        self.input_hash = trace_cache.input_hash(self.lst)
         self.completed_algorithms = set()
+        self.cached_algorithms = set()
         self.current_times = {}
-        self.running = False
+        self.op_counts = {}
+        self.stop_comparison()
         
-    def run_algorithm(self, algorithm_name, algorithm_func, lst):
+    def cache_key(self, name):
+        """Timings also depend on the kernels, backend, op counting and workers"""
+        variant = 'raw' if self.use_raw else 'visual + ops' if self.count_ops else 'visual'
+        if name in parallel_sorts.PARALLEL_SORTS:
+            variant += f", {self.workers} workers"
+        return f"{name} ({variant}, {self.backend})", self.input_hash, True
+
+    def cache_result(self, key, series, seconds, ops):
+        nbytes = series.xs.nbytes + series.ys.nbytes + trace_cache.ENTRY_OVERHEAD
+        self.cache.put(key, (seconds, series, ops), nbytes)
+
+    def run_algorithm(self, algorithm_name, algorithm_func, lst, key):
         start_time = time.time()
+        series = self.timing_data[algorithm_name]
         try:
+            if self.use_raw:
+                algorithm_func(lst, True)
+                current_time = time.time() - start_time
+                self.current_times[algorithm_name] = current_time
+                series.append(1, current_time)
+                self.cache_result(key, series, current_time, None)
+                return
+
+            step_iter = algorithm_func(lst, True)  # Always ascending
+            if self.count_ops:
+                self.op_counts[algorithm_name] = OpCounts()
+                step_iter = counted(step_iter, self.op_counts[algorithm_name])
+
             step_count = 0
-            for step_lst, color_positions in algorithm_func(lst, True):  # Always ascending
+            for step in step_iter:
                 if not self.running:  # Check if we should stop
                     break
                 step_count += 1
@@ -82,8 +131,14 @@ class ComparisonMode:
                 if step_count % 2 == 0:
                     current_time = time.time() - start_time
                     self.current_times[algorithm_name] = current_time
-                    self.timing_data[algorithm_name].append(current_time)
+                    series.append(step_count, current_time)
                     time.sleep(0.00001)
+            else:
+                current_time = time.time() - start_time
+                self.current_times[algorithm_name] = current_time
+                series.append(step_count, current_time)
+                counts = self.op_counts.get(algorithm_name) if self.count_ops else None
+                self.cache_result(key, series, current_time, None if counts is None else counts.snapshot())
 
         except Exception as e:
             print(f"Error in {algorithm_name}: {e}")
@@ -97,22 +152,81 @@ class ComparisonMode:
         self.running = True
         self.completed_algorithms = set()
         self.current_times = {}
-        self.timing_data = defaultdict(list)
+        self.op_counts = {}
+        self.timing_data = defaultdict(TimingSeries)
         self.start_time = time.time()
+
+        algorithms = self.raw_algorithms if self.use_raw else self.algorithms
+        # Runs already finished on this array with these settings come from the cache
+        self.cache_keys = {name: self.cache_key(name) for name in algorithms}
+        self.cached_algorithms = set()
+        for name in algorithms:
+            entry = self.cache.get(self.cache_keys[name])
+            if entry is None:
+                continue
+            seconds, series, ops = entry
+            self.current_times[name] = seconds
+            self.timing_data[name] = series
+            if ops is not None:
+                self.op_counts[name] = OpCounts.from_snapshot(ops)
+            self.completed_algorithms.add(name)
+            self.cached_algorithms.add(name)
+        algorithms = {name: func for name, func in algorithms.items() if name not in self.cached_algorithms}
+
+        if self.use_raw and not self.cached_algorithms.issuperset(parallel_sorts.PARALLEL_SORTS):
+            parallel_sorts.warm_up(self.workers)
+        if self.backend == 'process':
+            # The parallel engines start their own process pool, which a daemonic
+            # race worker may not do, so they run on threads here instead
+            raced = {name: func for name, func in algorithms.items()
+                     if name not in parallel_sorts.PARALLEL_SORTS}
+            if raced:
+                self.race = ProcessRace(raced, self.lst, raw=self.use_raw,
+                                        count_ops=self.count_ops).start()
+            algorithms = {name: func for name, func in algorithms.items()
+                          if name in parallel_sorts.PARALLEL_SORTS}
         
         # Start each algorithm in its own thread
         threads = []
-        for name, func in self.algorithms.items():
+        for name, func in algorithms.items():
+            if name in parallel_sorts.PARALLEL_SORTS:
+                # Arrays here are small, so skip the in-process cutoff to race the real pool
+                func = functools.partial(func, workers=self.workers, min_size=0)
+            ndarray = name in sort_algos.NDARRAY_SORTS or name in parallel_sorts.PARALLEL_SORTS
+            lst = np.array(self.lst, dtype=np.int64) if ndarray else self.lst
             thread = threading.Thread(
                 target=self.run_algorithm,
-                args=(name, func, self.lst.copy())
+                args=(name, func, lst, self.cache_keys[name])
             )
             thread.daemon = True
             thread.start()
             threads.append(thread)
     
+    def poll_results(self):
+        """Apply progress and timing messages streamed back by the process backend"""
+        if self.race is None:
+            return
+        for kind, name, value, steps, ops in self.race.poll():
+            if ops is not None:
+                self.op_counts[name] = OpCounts.from_snapshot(ops)
+            if kind == 'progress' or kind == 'done':
+                self.current_times[name] = value
+                self.timing_data[name].append(steps, value)
+            if kind == 'done':
+                self.cache_result(self.cache_keys[name], self.timing_data[name], value, ops)
+            elif kind == 'error':
+                print(f"Error in {name}: {value}")
+            if kind != 'progress':
+                self.completed_algorithms.add(name)
+        if self.completed_algorithms.issuperset(self.race.processes):
+            self.race.close()
+            self.race = None
+
     def stop_comparison(self):
         self.running = False
+        if self.race is not None:
+            self.race.cancel()
+            self.race = None
         
     def draw(self):
         self.window.fill(self.WHITE)
@@ -121,7 +235,7 @@ class ComparisonMode:
         self.window.blit(title, (self.width/2 - title.get_width()/2, 10))
         
         # Controls
-        controls_text = "R - Reset | SPACE - Start/Stop | +/- - Array Size (±50) | ,/. - Max Value (±100)"
+        controls_text = "R - Reset | SPACE - Start/Stop | +/- - Array Size (±50) | ,/. - Max Value (±100) | K - Kernels | P - Backend | O - Op Counts | W - Workload"
         controls = self.FONT.render(controls_text, 1, self.BLACK)
         self.window.blit(controls, (self.window.get_width()/2 - controls.get_width()/2, 50))
         
@@ -137,6 +251,25 @@ class ComparisonMode:
         status = "Running" if self.running else "Stopped"
         status_text = self.FONT.render(f"Status: {status}", 1, self.BLACK)
         self.window.blit(status_text, (10, 125))
+
+        kernel_text = self.FONT.render(f"Kernels: {'Raw' if self.use_raw else 'Visual'}", 1, self.BLACK)
+        self.window.blit(kernel_text, (200, 80))
+
+        backend_name = 'Processes' if self.backend == 'process' else 'Threads'
+        backend_text = self.FONT.render(f"Backend: {backend_name}", 1, self.BLACK)
+        self.window.blit(backend_text, (200, 110))
+
+        ops_text = self.FONT.render(f"Op Counts: {'On' if self.count_ops else 'Off'}", 1, self.BLACK)
+        self.window.blit(ops_text, (400, 80))
+
+        workload_text = self.FONT.render(f"Workload: {self.workload}", 1, self.BLACK)
+        self.window.blit(workload_text, (400, 110))
+
+        workers_text = self.FONT.render(f"Workers: {self.workers} ([/])", 1, self.BLACK)
+        self.window.blit(workers_text, (600, 80))
+
+        cache_text = self.FONT.render(self.cache.stats_text(), 1, self.BLACK)
+        self.window.blit(cache_text, (600, 110))
         
         # Draw timing chart
         self.draw_timing_chart()
@@ -152,45 +285,55 @@ class ComparisonMode:
         chart_y = 150
         chart_width = self.width - 20
         chart_height = 400  
+        label_height = 25
+
+        # The frame, axes and title never change, so render them once
+        if self.chart_surface is None:
+            # Transparent outside the chart so the status text above it stays visible
+            self.chart_surface = pygame.Surface((chart_width, chart_height + label_height), pygame.SRCALPHA)
+            surface = self.chart_surface
+            top = label_height
+
+            # Draw chart background
+            pygame.draw.rect(surface, (240, 240, 240), (0, top, chart_width, chart_height))
+            pygame.draw.rect(surface, self.BLACK, (0, top, chart_width, chart_height), 2)
+
+            # Draw axes
+            pygame.draw.line(surface, self.BLACK, (0, top + chart_height), (chart_width, top + chart_height), 2)
+            pygame.draw.line(surface, self.BLACK, (0, top), (0, top + chart_height), 2)
+
+            # Chart labels
+            chart_title = self.FONT.render("Execution Time (seconds)", 1, self.BLACK)
+            surface.blit(chart_title, (chart_width/2 - chart_title.get_width()/2, 0))
+        self.window.blit(self.chart_surface, (chart_x, chart_y - label_height))
         
-        # Draw chart background
-        pygame.draw.rect(self.window, (240, 240, 240), (chart_x, chart_y, chart_width, chart_height))
-        pygame.draw.rect(self.window, self.BLACK, (chart_x, chart_y, chart_width, chart_height), 2)
-        
-        # Draw axes
-        pygame.draw.line(self.window, self.BLACK, (chart_x, chart_y + chart_height), (chart_x + chart_width, chart_y + chart_height), 2)
-        pygame.draw.line(self.window, self.BLACK, (chart_x, chart_y), (chart_x, chart_y + chart_height), 2)
-        
-        #Draw timing lines for each algorithm
-        if self.timing_data:
-            max_time = max(max(times) for times in self.timing_data.values()) if any(self.timing_data.values()) else 1
+        #Draw timing lines for each algorithm, decimated to a point pair per pixel
+        series = [(algorithm, times) for algorithm, times in list(self.timing_data.items()) if times]
+        if series:
+            max_time = max(times.max_y() for _, times in series)
             max_time = max(max_time, 0.1)  # Avoid division by zero
             
-            for i, (algorithm, times) in enumerate(self.timing_data.items()):
-                if not times:
+            for algorithm, times in series:
+                xs, ys = times.points(chart_width)
+                if len(xs) < 2:
                     continue
                     
                 color = self.algorithm_colors.get(algorithm, self.BLACK)
-                
-                # Draw timing line
-                for j in range(1, len(times)):
-                    x1 = chart_x + (j - 1) * chart_width / max(len(times) - 1, 1)
-                    y1 = chart_y + chart_height - (times[j - 1] / max_time) * chart_height
-                    x2 = chart_x + j * chart_width / max(len(times) - 1, 1)
-                    y2 = chart_y + chart_height - (times[j] / max_time) * chart_height
-                    pygame.draw.line(self.window, color, (x1, y1), (x2, y2), 2)
-        
-        # Chart labels
-        chart_title = self.FONT.render("Execution Time (seconds)", 1, self.BLACK)
-        self.window.blit(chart_title, (chart_x + chart_width/2 - chart_title.get_width()/2, chart_y - 25))
+                px = chart_x + xs * chart_width
+                py = chart_y + chart_height - (ys / max_time) * chart_height
+                pygame.draw.lines(self.window, color, False, np.column_stack((px, py)).tolist(), 2)
     
     def draw_algorithm_status(self):
         """Draw the status of each algorithm"""
         start_x = 10
         start_y = 570 
         
-        for i, (algorithm, color) in enumerate(self.algorithm_colors.items()):
-            y_pos = start_y + i * 25 
+        algorithms = self.raw_algorithms if self.use_raw else self.algorithms
+        # Squeeze the rows together once there are too many to fit at 25px
+        row_height = min(25, (self.height - start_y) // max(len(algorithms), 1))
+        for i, algorithm in enumerate(algorithms):
+            color = self.algorithm_colors.get(algorithm, self.BLACK)
+            y_pos = start_y + i * row_height
             
             # Algo name
             pygame.draw.rect(self.window, color, (start_x, y_pos, 20, 20))
@@ -200,6 +343,8 @@ class ComparisonMode:
             # Current time
             if algorithm in self.current_times:
                 time_text = f"{self.current_times[algorithm]:.3f}s"
+                if algorithm in self.cached_algorithms:
+                    time_text += " (cached)"
             elif algorithm in self.completed_algorithms:
                 time_text = "Completed"
             else:
@@ -217,6 +362,14 @@ class ComparisonMode:
                 status_color = self.RED
                 
             pygame.draw.circle(self.window, status_color, (start_x + 350, y_pos + 10), 8)
+
+            # Op counts
+            counts = self.op_counts.get(algorithm)
+            if counts is not None:
+                ops_text = (f"compares {counts.compares:,}  swaps {counts.swaps:,}  writes {counts.writes:,}  "
+                            f"moves {counts.moves:,}")
+                ops_display = self.FONT.render(ops_text, 1, self.BLACK)
+                self.window.blit(ops_display, (start_x + 380, y_pos + 2))
     
     def handle_events(self, event):
         #Handle user input events
@@ -230,6 +383,25 @@ class ComparisonMode:
                     self.stop_comparison()
                 else:
                     self.start_comparison()
+            elif event.key == pygame.K_k:
+                if not self.running:
+                    self.use_raw = not self.use_raw
+            elif event.key == pygame.K_p:
+                if not self.running:
+                    self.backend = 'thread' if self.backend == 'process' else 'process'
+            elif event.key == pygame.K_o:
+                if not self.running:
+                    self.count_ops = not self.count_ops
+            elif event.key == pygame.K_w:
+                if not self.running:
+                    self.workload = workloads.next_workload(self.workload)
+                    self.reset_array()
+            elif event.key == pygame.K_LEFTBRACKET:
+                if not self.running:
+                    self.workers = max(self.workers - 1, 1)
+            elif event.key == pygame.K_RIGHTBRACKET:
+                if not self.running:
+                    self.workers = min(self.workers + 1, max(8, parallel_sorts.DEFAULT_WORKERS))
             elif event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS:
                 self.array_size = min(self.array_size + 50, 3000)  # 50 increment
                 if not self.running:
@@ -266,10 +438,12 @@ def main():
                 if result == "exit":
                     running = False
         
+        comparison.poll_results()
         frame_count += 1
         if frame_count % 2 == 0:
             comparison.draw()
     
+    comparison.stop_comparison()
     pygame.quit()
 
 if __name__ == '__main__':
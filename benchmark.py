@@ -0,0 +1,362 @@
+"""Headless benchmark runner for the sort_algos kernels.
+
+Runs every algorithm over a set of sizes and seeds without pygame, times each
+trial with perf_counter_ns and reports median / IQR / min as a table and JSON.
+
+    python benchmark.py --sizes 100 1000 --seeds 0 1 2 --trials 5 --json out.json
+    python benchmark.py --workloads sorted reversed few_unique --algorithms quick_sort
+
+With --ops each row also carries median compares, swaps, writes, moves and
+peak auxiliary bytes (see op_counts.py), measured outside the timed trials.
+
+The parallel variant runs the multi-process engines (see parallel_sorts.py)
+once per --workers count and adds speedup and efficiency against one worker:
+
+    python benchmark.py --variant parallel --workers 1 2 4 8 --sizes 1000000
+
+--storage array hands the list-based kernels a compact array('q') instead of
+a list of ints (see buffers.py); with --ops the peak auxiliary memory column
+shows the difference.
+"""
+import argparse
+import collections
+import functools
+import gc
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import buffers
+import op_counts
+import parallel_sorts
+import sort_algos
+import steps
+import workloads
+
+VARIANTS = {
+    'visual': sort_algos.VISUAL_SORTS,
+    'raw': sort_algos.RAW_SORTS,
+    'parallel': parallel_sorts.PARALLEL_SORTS,
+}
+
+# Kernels that are timed on an int64 ndarray rather than a list
+NDARRAY_INPUTS = sort_algos.NDARRAY_SORTS | set(parallel_sorts.PARALLEL_SORTS)
+
+# How the other kernels get their input: a list of ints or an array('q')
+STORAGES = ('list', 'array')
+
+
+def slug(name):
+    return name.lower().replace(' ', '_')
+
+
+def resolve_algorithms(names, variant='visual'):
+    registry = VARIANTS[variant]
+    if not names:
+        return dict(registry)
+    by_slug = {slug(name): name for name in registry}
+    selected = {}
+    for name in names:
+        key = by_slug.get(slug(name))
+        if key is None:
+            raise SystemExit(f"Unknown algorithm '{name}'. Choose from: {', '.join(sorted(by_slug))}")
+        selected[key] = registry[key]
+    return selected
+
+
+def make_input(size, seed, min_val, max_val, workload='uniform'):
+    return workloads.make(workload, size, min_val, max_val, seed)
+
+
+def run_visual(func, lst, ascending=True):
+    """Replay the generator's steps onto a copy of lst and return the result"""
+    return steps.replay(func(lst, ascending), lst)
+
+
+def drain_visual(func, lst, ascending=True):
+    collections.deque(func(lst, ascending), maxlen=0)
+
+
+def run_raw(func, lst, ascending=True):
+    return func(lst, ascending)
+
+
+# variant -> (run and return the output, run for timing only)
+RUNNERS = {
+    'visual': (run_visual, drain_visual),
+    'raw': (run_raw, run_raw),
+    'parallel': (run_raw, run_raw),
+}
+
+
+def time_trial(run, func, lst, ascending=True):
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        run(func, lst, ascending)
+        return time.perf_counter_ns() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def count_ops(name, func, data, lst, ascending=True, variant='visual'):
+    """Op counts for one input, taken in untimed runs. Compares, swaps and
+    writes come from the visual generator of the same name, peak auxiliary
+    memory from the kernel that is being timed."""
+    counts = op_counts.OpCounts()
+    visual = sort_algos.VISUAL_SORTS.get(name)
+    if visual is not None:
+        collections.deque(op_counts.counted(visual(lst, ascending), counts), maxlen=0)
+    counts.peak_aux_bytes = op_counts.peak_aux_bytes(RUNNERS[variant][1], func, data, ascending)
+    ops = counts.as_dict()
+    if visual is None:
+        # No step stream to count, e.g. the NumPy kernels
+        ops.update(compares=None, swaps=None, writes=None, moves=None)
+    return ops
+
+
+def summarize_ops(ops):
+    """Median of each op count over the seeds"""
+    return {field: None if ops[0][field] is None else statistics.median(o[field] for o in ops)
+            for field in ops[0]}
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    if len(samples) > 1:
+        q1, _, q3 = statistics.quantiles(samples, n=4, method='inclusive')
+        iqr = q3 - q1
+    else:
+        iqr = 0
+    return {
+        'median_ns': statistics.median(samples),
+        'iqr_ns': iqr,
+        'min_ns': samples[0],
+    }
+
+
+def benchmark(algorithms, sizes, seeds, trials=5, warmup=1, min_val=0, max_val=1000,
+              ascending=True, verify=True, progress=None, variant='visual', ops=False,
+              workload_names=('uniform',), workers=(None,), storage='list'):
+    """Time every algorithm on every workload and size. For the parallel
+    variant, workers lists the worker counts to run each engine with.
+    storage is one of STORAGES."""
+    run_once, drain = RUNNERS[variant]
+    results = []
+    for name, kernel in algorithms.items():
+        for workload, size, count in itertools.product(workload_names, sizes, workers):
+            func = kernel if count is None else functools.partial(kernel, workers=count)
+            samples = []
+            seed_ops = []
+            for seed in seeds:
+                lst = make_input(size, seed, min_val, max_val, workload)
+                if name in NDARRAY_INPUTS:
+                    data = np.asarray(lst, dtype=np.int64)
+                else:
+                    data = buffers.compact(lst) if storage == 'array' else lst
+                if verify:
+                    out = buffers.to_list(run_once(func, data, ascending))
+                    if out != sorted(lst, reverse=not ascending):
+                        raise AssertionError(f"{name} produced unsorted output "
+                                             f"(workload={workload}, size={size}, seed={seed})")
+                for _ in range(warmup):
+                    time_trial(drain, func, data, ascending)
+                for _ in range(trials):
+                    samples.append(time_trial(drain, func, data, ascending))
+                if ops:
+                    seed_ops.append(count_ops(name, func, data, lst, ascending, variant))
+            row = {'algorithm': name, 'variant': variant, 'workload': workload, 'size': size,
+                   'storage': storage, 'seeds': list(seeds), 'trials': trials}
+            if count is not None:
+                row['workers'] = count
+            row.update(summarize(samples))
+            row['samples_ns'] = samples
+            if ops:
+                row['ops'] = summarize_ops(seed_ops)
+            results.append(row)
+            if progress:
+                progress(row)
+    return results
+
+
+def add_speedup(results):
+    """Give every row with a worker count its speedup over the one-worker row
+    for the same algorithm, workload and size, and its efficiency
+    (speedup per worker)"""
+    single = {(row['algorithm'], row['workload'], row['size']): row['median_ns']
+              for row in results if row.get('workers') == 1}
+    for row in results:
+        base = single.get((row['algorithm'], row['workload'], row['size']))
+        if 'workers' in row and base is not None:
+            row['speedup'] = base / row['median_ns']
+            row['efficiency'] = row['speedup'] / row['workers']
+    return results
+
+
+EQUIVALENCE_CASES = [
+    [], [7], [2, 1], [1, 2], [5, 5, 5, 5], [3, -1, 0, -7, 3, 2, -1],
+    list(range(20)), list(range(20, 0, -1)), [0, 1000, 0, 1000, 500],
+    [-(2 ** 62), 2 ** 62, 1, 2, 3], [-(2 ** 63), 2 ** 63 - 1, 0, 5],
+]
+
+
+def check_equivalence(names=None, sizes=(1, 2, 17, 100, 257), seeds=(0, 1, 2),
+                      min_val=-500, max_val=500):
+    """Run the visual and raw variant of each algorithm on the same inputs,
+    given both as a list and as an array('q'), and return a list of mismatch
+    descriptions (empty when they all agree)"""
+    visual = resolve_algorithms(names, 'visual')
+    raw = resolve_algorithms(names, 'raw')
+    cases = list(EQUIVALENCE_CASES)
+    for size in sizes:
+        for seed in seeds:
+            cases.append(make_input(size, seed, min_val, max_val))
+
+    mismatches = []
+    for name, func in visual.items():
+        if name not in raw:
+            continue
+        for lst in cases:
+            for ascending in (True, False):
+                expected = sorted(lst, reverse=not ascending)
+                for storage in STORAGES:
+                    data = buffers.compact(lst) if storage == 'array' else list(lst)
+                    visual_out = run_visual(func, data, ascending)
+                    raw_out = buffers.to_list(raw[name](data, ascending))
+                    if visual_out != raw_out or raw_out != expected or buffers.to_list(data) != lst:
+                        mismatches.append(f"{name} (ascending={ascending}, n={len(lst)}, {storage}): "
+                                          f"visual={visual_out[:8]} raw={raw_out[:8]}")
+    return mismatches
+
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+    }
+
+
+def format_count(value):
+    return '-' if value is None else f"{value:.0f}"
+
+
+def format_table(results):
+    with_ops = any('ops' in row for row in results)
+    with_workers = any('workers' in row for row in results)
+    header = (f"{'Algorithm':<20} {'Variant':<8} {'Workload':<13} {'Size':>8} {'Median (ms)':>12} "
+              f"{'IQR (ms)':>10} {'Min (ms)':>10}")
+    if with_workers:
+        header += f" {'Workers':>7} {'Speedup':>8} {'Efficiency':>10}"
+    if with_ops:
+        header += f" {'Compares':>12} {'Moves':>12} {'Aux (KiB)':>10}"
+    lines = [header, '-' * len(header)]
+    for row in results:
+        line = (f"{row['algorithm']:<20} {row['variant']:<8} {row['workload']:<13} {row['size']:>8} "
+                f"{row['median_ns'] / 1e6:>12.3f} {row['iqr_ns'] / 1e6:>10.3f} {row['min_ns'] / 1e6:>10.3f}")
+        if with_workers:
+            speedup = f"{row['speedup']:.2f}" if 'speedup' in row else '-'
+            efficiency = f"{row['efficiency']:.0%}" if 'efficiency' in row else '-'
+            line += f" {row.get('workers', '-'):>7} {speedup:>8} {efficiency:>10}"
+        if with_ops:
+            ops = row['ops']
+            line += (f" {format_count(ops['compares']):>12} {format_count(ops['moves']):>12} "
+                     f"{ops['peak_aux_bytes'] / 1024:>10.1f}")
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time the sort_algos kernels without pygame")
+    parser.add_argument('--algorithms', nargs='*', default=None,
+                        help="Algorithms to run, e.g. bubble_sort merge_sort (default: all)")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100, 500, 1000])
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0, 1, 2])
+    parser.add_argument('--trials', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--min-val', type=int, default=0)
+    parser.add_argument('--max-val', type=int, default=1000)
+    parser.add_argument('--workloads', nargs='+', default=['uniform'],
+                        choices=workloads.WORKLOAD_NAMES + ['all'], metavar='WORKLOAD',
+                        help=f"Input distributions to sweep ({', '.join(workloads.WORKLOAD_NAMES)} or all)")
+    parser.add_argument('--variant', choices=sorted(VARIANTS), default='visual',
+                        help="Time the step-yielding visual generators, the plain raw kernels "
+                             "or the multi-process engines")
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, parallel_sorts.DEFAULT_WORKERS],
+                        help="Worker counts for the parallel variant (1 is always added as the baseline)")
+    parser.add_argument('--storage', choices=STORAGES, default='list',
+                        help="Pass the list-based kernels a list of ints or a compact array('q')")
+    parser.add_argument('--descending', action='store_true')
+    parser.add_argument('--no-verify', action='store_true', help="Skip the sortedness check")
+    parser.add_argument('--ops', action='store_true',
+                        help="Also count compares/swaps/writes and peak auxiliary memory (untimed runs)")
+    parser.add_argument('--check-equivalence', action='store_true',
+                        help="Check that visual and raw variants agree, then exit")
+    parser.add_argument('--json', metavar='PATH', help="Write results as JSON ('-' for stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.check_equivalence:
+        mismatches = check_equivalence(args.algorithms)
+        for line in mismatches:
+            print(line)
+        print(f"{len(mismatches)} mismatches")
+        sys.exit(1 if mismatches else 0)
+
+    algorithms = resolve_algorithms(args.algorithms, args.variant)
+    workload_names = workloads.WORKLOAD_NAMES if 'all' in args.workloads else args.workloads
+
+    def progress(row):
+        workers = f" workers={row['workers']}" if 'workers' in row else ''
+        print(f"  {row['algorithm']:<20} {row['workload']:<13} n={row['size']:<8}{workers} "
+              f"median {row['median_ns'] / 1e6:.3f} ms",
+              file=sys.stderr)
+
+    workers = (None,)
+    if args.variant == 'parallel':
+        workers = sorted(set(args.workers) | {1})
+
+    results = benchmark(algorithms, args.sizes, args.seeds, args.trials, args.warmup,
+                        args.min_val, args.max_val, not args.descending,
+                        not args.no_verify, progress, args.variant, args.ops, workload_names, workers,
+                        args.storage)
+    add_speedup(results)
+
+    report = {
+        'machine': machine_info(),
+        'config': {
+            'sizes': args.sizes, 'seeds': args.seeds, 'trials': args.trials, 'workloads': workload_names,
+            'variant': args.variant, 'warmup': args.warmup, 'min_val': args.min_val, 'max_val': args.max_val,
+            'ascending': not args.descending, 'ops': args.ops, 'storage': args.storage,
+            'workers': None if workers == (None,) else workers,
+        },
+        'results': results,
+    }
+
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print(format_table(results))
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
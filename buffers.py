@@ -0,0 +1,67 @@
+"""Compact integer storage for the sort kernels.
+
+A list of ints costs a pointer plus an int object per element, about 36
+bytes; an array('q') or int64 ndarray costs 8. Every kernel in sort_algos
+copies its input with working_copy() and allocates its scratch space with
+zeros_like(), so it keeps working in whatever storage it was given: lists
+stay lists, array.array input gives array.array copies and buffers. Kernels
+never modify their input, so one buffer can be shared by any number of
+kernels.
+
+Reading an element of an array.array boxes a new int, so kernels run about
+1.5-2.5x slower on one than on a list. Compact storage only pays off for
+large arrays; compact_if_large() picks it from COMPACT_MIN_SIZE elements up.
+
+    data = buffers.compact(values)          # array('q'), 8 bytes per element
+    out = sort_algos.merge_sort_raw(data)   # array('q')
+"""
+from array import array
+
+import numpy as np
+
+TYPECODE = 'q'  # signed 64-bit, the same as the int64 ndarrays used elsewhere
+COMPACT_MIN_SIZE = 1 << 16  # below this a list costs under ~2 MiB more
+
+
+def compact(values):
+    """values as a new array('q'); raises OverflowError outside int64"""
+    if isinstance(values, np.ndarray):
+        return array(TYPECODE, np.ascontiguousarray(values, dtype=np.int64).tobytes())
+    return array(TYPECODE, values)
+
+
+def compact_if_large(values):
+    """values as an array('q') from COMPACT_MIN_SIZE elements up, else as a list"""
+    if len(values) >= COMPACT_MIN_SIZE:
+        return compact(values)
+    return values.tolist() if isinstance(values, np.ndarray) else list(values)
+
+
+def working_copy(arr):
+    """A mutable copy of arr for a kernel to sort. array.array input is copied
+    as is and integer ndarrays become array('q'), since indexing an ndarray
+    from Python is slow; anything else becomes a list."""
+    if isinstance(arr, array):
+        return arr[:]
+    if isinstance(arr, np.ndarray):
+        return compact(arr) if np.can_cast(arr.dtype, np.int64) else arr.tolist()
+    return list(arr)
+
+
+def zeros_like(arr, n):
+    """n zeros in the same kind of storage as arr"""
+    if isinstance(arr, array):
+        return array(arr.typecode, [0]) * n
+    return [0] * n
+
+
+def like(arr, values):
+    """values in the same kind of storage as arr, e.g. to assign to a slice of it"""
+    if isinstance(arr, array):
+        return array(arr.typecode, values)
+    return values if isinstance(values, list) else list(values)
+
+
+def to_list(values):
+    """Any kernel output (list, array.array or ndarray) as a list"""
+    return values if isinstance(values, list) else values.tolist()
@@ -0,0 +1,263 @@
+"""External merge sort for files of integers larger than memory.
+
+The input is read in chunks that fit the memory cap. Each chunk is sorted
+in place with NumPy and spilled to a temporary run file of little-endian
+int64. Runs are then merged at most fan_in at a time with heapq.merge over
+readers that walk each run through mmap a block at a time, pass after pass,
+until one run is left; the last pass writes the output file.
+
+Binary files hold little-endian int64; text files hold whitespace-separated
+integers. The format is taken from the extension (.txt is text) unless given.
+
+    python external_sort.py numbers.bin sorted.bin --memory-mb 64 --fan-in 16
+    python external_sort.py numbers.txt sorted.txt --generate 1000000
+
+progress, when given, is called with one dict per event:
+
+    {'phase': 'run', 'run': id, 'size': items, 'bytes': bytes read, 'total_bytes': input size}
+    {'phase': 'merge', 'pass': p, 'inputs': [run ids], 'output': run id (None on the
+     last pass), 'done': items merged so far, 'size': items in the merge}
+    {'phase': 'done', 'items': total items, 'runs': initial runs, 'passes': merge passes}
+
+Raising from progress aborts the sort; temporary files are removed either way.
+"""
+import argparse
+import heapq
+import itertools
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+import workloads
+
+DEFAULT_MEMORY_LIMIT = 64 << 20  # bytes
+DEFAULT_FAN_IN = 16
+ITEM_BYTES = 8  # one int64 in an ndarray
+LIST_ITEM_BYTES = 40  # a list slot plus a small int object
+TEXT_BLOCK = 1 << 16  # tokens parsed at a time into a text chunk
+FORMATS = ('binary', 'text')
+
+
+def guess_format(path):
+    return 'text' if os.path.splitext(path)[1].lower() == '.txt' else 'binary'
+
+
+def write_ints(path, values, fmt=None):
+    """Write an array of integers to path in the given (or guessed) format"""
+    fmt = fmt or guess_format(path)
+    values = np.asarray(values, dtype=np.int64)
+    if fmt == 'text':
+        with open(path, 'w') as f:
+            for lo in range(0, len(values), 1 << 16):
+                f.write(''.join(f"{v}\n" for v in values[lo:lo + (1 << 16)].tolist()))
+    else:
+        values.astype('<i8').tofile(path)
+
+
+def read_ints(path, fmt=None):
+    """Read a whole file of integers; for checking small outputs"""
+    fmt = fmt or guess_format(path)
+    if fmt == 'text':
+        with open(path) as f:
+            return np.array(f.read().split(), dtype=np.int64)
+    return np.fromfile(path, dtype='<i8')
+
+
+def _read_chunks(path, fmt, memory_limit):
+    """Yield (chunk, bytes read so far) with int64 chunks of memory_limit
+    bytes. Each chunk is released before the next one is read, so the caller
+    should drop its reference too."""
+    count = max(memory_limit // ITEM_BYTES, 1)
+    if fmt == 'text':
+        with open(path) as f:
+            consumed = 0
+
+            def tokens():
+                nonlocal consumed
+                for line in f:
+                    consumed += len(line)
+                    yield from line.split()
+
+            # Parse a block of tokens at a time into a preallocated chunk, so
+            # only TEXT_BLOCK tokens exist as Python objects at once
+            stream = tokens()
+            while True:
+                chunk = np.empty(count, dtype=np.int64)
+                filled = 0
+                while filled < count:
+                    block = np.fromiter(map(int, itertools.islice(stream, min(TEXT_BLOCK, count - filled))),
+                                        dtype=np.int64)
+                    if not len(block):
+                        break
+                    chunk[filled:filled + len(block)] = block
+                    filled += len(block)
+                if not filled:
+                    return
+                yield chunk[:filled], consumed
+                chunk = block = None
+    else:
+        if os.path.getsize(path) % ITEM_BYTES:
+            raise ValueError(f"{path} is not a whole number of int64 values")
+        with open(path, 'rb') as f:
+            while True:
+                chunk = np.fromfile(f, dtype='<i8', count=count)
+                if not len(chunk):
+                    return
+                yield chunk, f.tell()
+                chunk = None
+
+
+def _read_run(path, block):
+    """Values of a run file, read through mmap `block` items at a time"""
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    values = np.frombuffer(mm, dtype='<i8')
+    try:
+        for lo in range(0, len(values), block):
+            yield from values[lo:lo + block].tolist()
+    finally:
+        values = None  # release the buffer before closing
+        mm.close()
+
+
+class _Output:
+    """Buffered writer for a run file or the final output"""
+
+    def __init__(self, path, fmt):
+        self.fmt = fmt
+        self.file = open(path, 'w' if fmt == 'text' else 'wb')
+
+    def write(self, values):
+        if self.fmt == 'text':
+            self.file.write(''.join(f"{v}\n" for v in values))
+        else:
+            np.array(values, dtype='<i8').tofile(self.file)
+
+    def close(self):
+        self.file.close()
+
+
+def external_sort(input_path, output_path, memory_limit=DEFAULT_MEMORY_LIMIT, fan_in=DEFAULT_FAN_IN,
+                  ascending=True, input_format=None, output_format=None, progress=None, tmp_dir=None):
+    """Sort the integers in input_path into output_path using about
+    memory_limit bytes of memory; returns the 'done' progress event"""
+    if fan_in < 2:
+        raise ValueError("fan_in must be at least 2")
+    input_format = input_format or guess_format(input_path)
+    output_format = output_format or input_format
+    report = progress or (lambda event: None)
+    # Merge buffers: one block per input plus one for the output
+    block = max(memory_limit // (LIST_ITEM_BYTES * (fan_in + 1)), 1)
+
+    work_dir = tempfile.mkdtemp(prefix='extsort_', dir=tmp_dir)
+    try:
+        # Run formation
+        runs = []  # (run id, path, items)
+        total_bytes = os.path.getsize(input_path)
+        for chunk, consumed in _read_chunks(input_path, input_format, memory_limit):
+            chunk.sort()
+            if not ascending:
+                chunk = chunk[::-1]  # a view; tofile writes it without a copy
+            run_id = len(runs)
+            path = os.path.join(work_dir, f"run_{run_id}.bin")
+            chunk.astype('<i8', copy=False).tofile(path)
+            runs.append((run_id, path, len(chunk)))
+            report({'phase': 'run', 'run': run_id, 'size': len(chunk),
+                    'bytes': consumed, 'total_bytes': total_bytes})
+            chunk = None
+        initial_runs = len(runs)
+        total = sum(items for _, _, items in runs)
+
+        # Merge passes; the last one writes the output
+        next_id = len(runs)
+        passes = 0
+        while True:
+            passes += 1
+            last = len(runs) <= fan_in
+            merged = []
+            # An empty input still gets an (empty) output file
+            groups = [runs[lo:lo + fan_in] for lo in range(0, len(runs), fan_in)] or [[]]
+            for group in groups:
+                size = sum(items for _, _, items in group)
+                if last:
+                    run_id, path, fmt = None, output_path, output_format
+                else:
+                    run_id, path, fmt = next_id, os.path.join(work_dir, f"run_{next_id}.bin"), 'binary'
+                    next_id += 1
+                event = {'phase': 'merge', 'pass': passes, 'inputs': [r[0] for r in group],
+                         'output': run_id, 'done': 0, 'size': size}
+                report(dict(event))
+
+                out = _Output(path, fmt)
+                try:
+                    values = heapq.merge(*(_read_run(p, block) for _, p, _ in group), reverse=not ascending)
+                    while True:
+                        values_block = list(itertools.islice(values, block))
+                        if not values_block:
+                            break
+                        out.write(values_block)
+                        event['done'] += len(values_block)
+                        report(dict(event))
+                finally:
+                    out.close()
+
+                for _, p, _ in group:
+                    os.remove(p)
+                merged.append((run_id, path, size))
+            runs = merged
+            if last:
+                break
+
+        done = {'phase': 'done', 'items': total, 'runs': initial_runs, 'passes': passes}
+        report(done)
+        return done
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sort a file of integers larger than memory")
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--memory-mb', type=float, default=DEFAULT_MEMORY_LIMIT / (1 << 20),
+                        help="Memory cap for run formation and merge buffers")
+    parser.add_argument('--fan-in', type=int, default=DEFAULT_FAN_IN, help="Runs merged at a time")
+    parser.add_argument('--format', choices=FORMATS, help="Input format (default: from the extension)")
+    parser.add_argument('--output-format', choices=FORMATS, help="Output format (default: the input's)")
+    parser.add_argument('--descending', action='store_true')
+    parser.add_argument('--tmp-dir', help="Directory for the run files")
+    parser.add_argument('--generate', type=int, metavar='N',
+                        help="First write N integers from --workload to the input file")
+    parser.add_argument('--workload', choices=workloads.WORKLOAD_NAMES, default='uniform')
+    parser.add_argument('--min-val', type=int, default=0)
+    parser.add_argument('--max-val', type=int, default=1 << 40)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.generate is not None:
+        values = workloads.make_array(args.workload, args.generate, args.min_val, args.max_val, args.seed)
+        write_ints(args.input, values, args.format)
+
+    def progress(event):
+        if event['phase'] == 'run':
+            print(f"  run {event['run']:<6} {event['size']} items "
+                  f"({event['bytes'] / max(event['total_bytes'], 1):.0%} read)", file=sys.stderr)
+        elif event['phase'] == 'merge' and event['done'] == event['size']:
+            target = 'output' if event['output'] is None else f"run {event['output']}"
+            print(f"  pass {event['pass']}: merged {len(event['inputs'])} runs into {target}",
+                  file=sys.stderr)
+
+    done = external_sort(args.input, args.output, int(args.memory_mb * (1 << 20)), args.fan_in,
+                         not args.descending, args.format, args.output_format, progress, args.tmp_dir)
+    print(f"Sorted {done['items']} items: {done['runs']} runs, {done['passes']} merge passes")
+
+
+if __name__ == '__main__':
+    main()
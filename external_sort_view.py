@@ -0,0 +1,244 @@
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import pygame
+
+import external_sort
+import workloads
+
+
+class Cancelled(Exception):
+    pass
+
+
+class ExternalSortView:
+    """Live view of external_sort: one row per merge level, each run drawn
+    under the input it came from, merged runs under the runs they consumed"""
+
+    def __init__(self, width, height, input_path=None):
+        self.width = width
+        self.height = height
+        self.window = pygame.display.set_mode((width, height))
+        pygame.display.set_caption("External Sort")
+
+        self.BLACK = (0, 0, 0)
+        self.WHITE = (255, 255, 255)
+        self.GRAY = (200, 200, 200)
+        self.RUN_COLOR = (70, 130, 180)
+        self.MERGING_COLOR = (255, 200, 0)
+        self.WRITING_COLOR = (0, 170, 0)
+        self.OUTPUT_COLOR = (0, 120, 0)
+
+        self.FONT = pygame.font.SysFont('comicsans', 16)
+        self.LARGE_FONT = pygame.font.SysFont('comicsans', 24)
+
+        # State: 2M items under a 1 MiB cap with fan-in 4 gives ~16 runs in 2 passes
+        self.items = 1 << 21
+        self.memory_limit = 1 << 20
+        self.fan_in = 4
+        self.work_dir = tempfile.mkdtemp(prefix='extsort_view_')
+        self.generate = input_path is None  # sort generated data rather than a given file
+        self.input_path = input_path or os.path.join(self.work_dir, 'input.bin')
+        self.output_path = os.path.join(self.work_dir, 'sorted.bin')
+
+        self.events = queue.Queue()
+        self.thread = None
+        self.cancelled = False
+        self.reset()
+
+    def reset(self):
+        self.runs = {}  # run id -> {'level', 'span', 'size', 'done', 'state'}
+        self.levels = 1
+        self.phase = 'idle'
+        self.total_bytes = 0
+        self.read_bytes = 0
+        self.result = None
+        self.error = None
+        self.start_time = 0
+        self.elapsed = 0
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.reset()
+        self.cancelled = False
+        self.events = queue.Queue()  # drop anything left over from the previous run
+        self.phase = 'generating' if self.generate else 'runs'
+        self.start_time = time.time()
+        self.thread = threading.Thread(target=self.run_sort, daemon=True)
+        self.thread.start()
+
+    def run_sort(self):
+        def progress(event):
+            if self.cancelled:
+                raise Cancelled
+            self.events.put(event)
+        try:
+            if self.generate:
+                external_sort.write_ints(self.input_path, workloads.make_array('uniform', self.items, 0, 1 << 40))
+                if self.cancelled:
+                    return
+            external_sort.external_sort(self.input_path, self.output_path, self.memory_limit, self.fan_in,
+                                        output_format='binary', progress=progress, tmp_dir=self.work_dir)
+        except Cancelled:
+            pass
+        except Exception as e:
+            self.events.put({'phase': 'error', 'error': repr(e)})
+
+    def stop(self):
+        self.cancelled = True
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def poll_events(self):
+        """Apply the progress events sent by the sorting thread"""
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            phase = event['phase']
+            if phase == 'run':
+                self.phase = 'runs'
+                start = self.read_bytes / max(event['total_bytes'], 1)
+                self.total_bytes = event['total_bytes']
+                self.read_bytes = event['bytes']
+                self.runs[event['run']] = {'level': 0, 'span': (start, self.read_bytes / max(self.total_bytes, 1)),
+                                           'size': event['size'], 'done': event['size'], 'state': 'run'}
+            elif phase == 'merge':
+                self.phase = 'merge'
+                inputs = [self.runs[i] for i in event['inputs']]
+                for run in inputs:
+                    run['state'] = 'merging'
+                span = (min((r['span'][0] for r in inputs), default=0), max((r['span'][1] for r in inputs), default=1))
+                key = ('output', event['pass']) if event['output'] is None else event['output']
+                self.levels = max(self.levels, event['pass'] + 1)
+                self.runs[key] = {'level': event['pass'], 'span': span, 'size': event['size'],
+                                  'done': event['done'], 'state': 'writing'}
+                if event['done'] == event['size']:
+                    for run in inputs:
+                        run['state'] = 'merged'
+                    self.runs[key]['state'] = 'output' if event['output'] is None else 'run'
+            elif phase == 'done':
+                self.phase = 'done'
+                self.result = event
+                self.elapsed = time.time() - self.start_time
+            elif phase == 'error':
+                self.phase = 'error'
+                self.error = event['error']
+        if self.phase in ('generating', 'runs', 'merge'):
+            self.elapsed = time.time() - self.start_time
+
+    def draw(self):
+        self.window.fill(self.WHITE)
+
+        title = self.LARGE_FONT.render("External Merge Sort", 1, self.BLACK)
+        self.window.blit(title, (self.width/2 - title.get_width()/2, 10))
+
+        controls_text = "SPACE - Start | LEFT/RIGHT - Items | +/- - Memory Cap | UP/DOWN - Fan-in | ESC - Exit"
+        controls = self.FONT.render(controls_text, 1, self.BLACK)
+        self.window.blit(controls, (self.width/2 - controls.get_width()/2, 45))
+
+        source = f"Items: {self.items:,}" if self.generate else f"Input: {self.input_path}"
+        settings = f"{source} | Memory cap: {self.memory_limit / (1 << 20):g} MiB | Fan-in: {self.fan_in}"
+        self.window.blit(self.FONT.render(settings, 1, self.BLACK), (10, 75))
+
+        if self.phase == 'done':
+            status = (f"Done: {self.result['items']:,} items, {self.result['runs']} runs, "
+                      f"{self.result['passes']} merge passes in {self.elapsed:.2f}s")
+        elif self.phase == 'error':
+            status = f"Error: {self.error}"
+        elif self.phase == 'idle':
+            status = "Press SPACE to sort"
+        elif self.phase == 'generating':
+            status = f"Generating input... {self.elapsed:.2f}s"
+        else:
+            status = f"{'Forming runs' if self.phase == 'runs' else 'Merging'}... {self.elapsed:.2f}s"
+        self.window.blit(self.FONT.render(status, 1, self.BLACK), (10, 100))
+
+        # Input read progress
+        bar_x, bar_y, bar_width = 10, 130, self.width - 20
+        pygame.draw.rect(self.window, self.GRAY, (bar_x, bar_y, bar_width, 12))
+        if self.total_bytes:
+            pygame.draw.rect(self.window, self.RUN_COLOR,
+                             (bar_x, bar_y, bar_width * self.read_bytes / self.total_bytes, 12))
+
+        # One row per level: initial runs, then the output of each merge pass
+        top = 160
+        row_height = min(80, (self.height - top - 10) // max(self.levels, 1))
+        for key, run in self.runs.items():
+            x = bar_x + run['span'][0] * bar_width
+            w = max((run['span'][1] - run['span'][0]) * bar_width - 2, 1)
+            y = top + run['level'] * row_height
+            h = row_height - 10
+            if run['state'] == 'writing':
+                pygame.draw.rect(self.window, self.GRAY, (x, y, w, h))
+                pygame.draw.rect(self.window, self.WRITING_COLOR, (x, y, w * run['done'] / max(run['size'], 1), h))
+            else:
+                color = {'run': self.RUN_COLOR, 'merging': self.MERGING_COLOR,
+                         'merged': self.GRAY, 'output': self.OUTPUT_COLOR}[run['state']]
+                pygame.draw.rect(self.window, color, (x, y, w, h))
+            pygame.draw.rect(self.window, self.BLACK, (x, y, w, h), 1)
+
+        pygame.display.update()
+
+    def handle_events(self, event):
+        if event.type != pygame.KEYDOWN:
+            return None
+        if event.key == pygame.K_ESCAPE:
+            return "exit"
+        busy = self.thread is not None and self.thread.is_alive()
+        if event.key == pygame.K_SPACE:
+            self.start()
+        elif busy:
+            return None
+        elif event.key == pygame.K_RIGHT:
+            self.items = min(self.items * 2, 1 << 26)
+        elif event.key == pygame.K_LEFT:
+            self.items = max(self.items // 2, 1 << 12)
+        elif event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS:
+            self.memory_limit = min(self.memory_limit * 2, 1 << 30)
+        elif event.key == pygame.K_MINUS:
+            self.memory_limit = max(self.memory_limit // 2, 1 << 14)
+        elif event.key == pygame.K_UP:
+            self.fan_in = min(self.fan_in + 1, 64)
+        elif event.key == pygame.K_DOWN:
+            self.fan_in = max(self.fan_in - 1, 2)
+        return None
+
+    def close(self):
+        self.stop()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def main(input_path=None):
+    pygame.init()
+    clock = pygame.time.Clock()
+
+    view = ExternalSortView(1000, 600, input_path)
+    running = True
+
+    while running:
+        clock.tick(60)
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif view.handle_events(event) == "exit":
+                running = False
+
+        view.poll_events()
+        view.draw()
+
+    view.close()
+    pygame.quit()
+    return "exit"
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,7 +1,15 @@
 import pygame
 import sort_algos
+import steps
 import numpy as np
 import time
+import os
+import sys
+import buffers
+import sort_trace
+import trace_cache
+import workloads
+from lod import ColumnAggregates
 
 pygame.init()
 
@@ -22,20 +30,41 @@ class DrawInformation:
     LARGE_FONT = pygame.font.SysFont('comicsans', 30)
     SIDE_PAD = 100
     TOP_PAD = 175
+    # Below this many pixels per bar the NumPy renderer takes over, and once
+    # there are more elements than pixel columns, the level-of-detail one does
+    VECTOR_BAR_WIDTH = 2
+    LOD_BAR_WIDTH = 1
+    LOD_BAND_COLOR = (215, 215, 235)
 
     def __init__(self, width, height, lst):
         self.width = width
         self.height = height
-        self.window = pygame.display.set_mode((width, height))
+        self.window = pygame.display.set_mode((width, height), pygame.RESIZABLE)
         pygame.display.set_caption("Sorting Algorithm Visualization")
+        self.drawn_highlights = set()  # columns drawn highlighted last frame
+        self.plot_surface = None  # pixel buffer for draw_list_vectorized
+        self.lod = None  # ColumnAggregates for draw_list_lod
         self.set_list(lst)
 
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+        self.window = pygame.display.set_mode((width, height), pygame.RESIZABLE)
+        self.plot_surface = None
+        self.set_list(self.lst)
+
+    def invalidate(self):
+        """Force the next draw_list to repaint every column"""
+        self.full_redraw = True
+
     def set_list(self, lst):
         self.lst = lst
+        self.full_redraw = True
         if len(lst) > 0:
             self.min_val = min(lst)
             self.max_val = max(lst)
-            self.block_width = round((self.width - self.SIDE_PAD) / len(lst))
+            self.bar_width = (self.width - self.SIDE_PAD) / len(lst)
+            self.block_width = round(self.bar_width)
             
             if self.max_val == self.min_val:
                 self.block_height_unit = 0
@@ -43,54 +72,237 @@ class DrawInformation:
                 self.block_height_unit = (self.height - self.TOP_PAD) / (self.max_val - self.min_val)
         self.start_x = self.SIDE_PAD // 2
 
-def create_starting_list(n, min_val, max_val):
-    return np.random.randint(low=min_val, high=max_val + 1, size=n).tolist()
+# Stepping speed in steps per frame, and the time a frame may spend stepping
+MIN_SPEED = 1 / 64
+MAX_SPEED = 1 << 20
+FRAME_TIME_BUDGET = 0.004
 
-def draw(draw_info, algo_name, ascending, elapsed_time, color_positions, sorting):
-    draw_info.window.fill(draw_info.BACKGROUND_COLOR)
+# Array sizes reachable with +/- (doubling from the default of 50)
+MIN_SIZE = 10
+MAX_SIZE = 50 << 15
+
+def create_starting_list(n, min_val, max_val, workload='uniform'):
+    return buffers.compact_if_large(workloads.make_array(workload, n, min_val, max_val))
+
+def draw(draw_info, algo_name, ascending, elapsed_time, color_positions, sorting, replay=None, speed=1,
+         workload=None, cache=None):
+    header_rect = pygame.Rect(0, 0, draw_info.width, draw_info.TOP_PAD)
+    if draw_info.full_redraw:
+        draw_info.window.fill(draw_info.BACKGROUND_COLOR)
+    else:
+        draw_info.window.fill(draw_info.BACKGROUND_COLOR, header_rect)
 
     title = draw_info.LARGE_FONT.render(f"{algo_name} - {'Ascending' if ascending else 'Descending'}", 1, draw_info.BLACK)
     draw_info.window.blit(title, (draw_info.width/2 - title.get_width()/2, 5))
     
     # Controls
-    if sorting:
-        controls_text = "R - Reset | SPACE - Stop"
+    if replay is not None:
+        controls_text = "SPACE - Pause | LEFT/RIGHT - Step | UP/DOWN - Speed | 0-9 - Jump | E - Exit Replay"
+    elif sorting:
+        controls_text = "R - Reset | SPACE - Stop | UP/DOWN - Speed | F - Finish"
     else:
-        controls_text = "R - Reset | SPACE - Start | A - Ascending | D - Descending"
+        controls_text = "R - Reset | SPACE - Start | A/D - Asc/Desc | +/- - Size | W - Workload | T - Record Trace"
     controls = draw_info.FONT.render(controls_text, 1, draw_info.BLACK)
     draw_info.window.blit(controls, (draw_info.width/2 - controls.get_width()/2, 55))
 
-    sorting_keys1 = draw_info.FONT.render("I - Insertion | B - Bubble | M - Merge | Q - Quick | H - Heap", 1, draw_info.BLACK)
+    sorting_keys1 = draw_info.FONT.render("I - Insertion | B - Bubble | M - Merge | K - Tim | Q - Quick | N - Intro | H - Heap", 1, draw_info.BLACK)
     draw_info.window.blit(sorting_keys1, (draw_info.width/2 - sorting_keys1.get_width()/2, 85))
     
-    sorting_keys2 = draw_info.FONT.render("X - Radix | U - Bucket | S - Selection | C - Counting", 1, draw_info.BLACK)
+    sorting_keys2 = draw_info.FONT.render("X - Radix | Z - MSD Radix | U - Bucket | S - Selection | C - Counting | G - Floyd Heap", 1, draw_info.BLACK)
     draw_info.window.blit(sorting_keys2, (draw_info.width/2 - sorting_keys2.get_width()/2, 110))
     
-    time_text = draw_info.FONT.render(f"Time: {elapsed_time:.2f}s", 1, draw_info.BLACK)
+    if replay is not None:
+        percent = 100 * replay.position / max(len(replay), 1)
+        time_text = draw_info.FONT.render(f"Step {replay.position}/{len(replay)} ({percent:.1f}%) x{speed:g}", 1, draw_info.BLACK)
+    else:
+        time_text = draw_info.FONT.render(f"Time: {elapsed_time:.2f}s x{speed:g}", 1, draw_info.BLACK)
     draw_info.window.blit(time_text, (10, 5))
 
-    draw_list(draw_info, color_positions)
-    pygame.display.update()
+    size_label = f"n = {len(draw_info.lst)}" if workload is None else f"n = {len(draw_info.lst)} ({workload})"
+    size_text = draw_info.FONT.render(size_label, 1, draw_info.BLACK)
+    draw_info.window.blit(size_text, (10, 30))
+
+    if cache is not None:
+        cache_text = draw_info.FONT.render(cache.stats_text(), 1, draw_info.BLACK)
+        draw_info.window.blit(cache_text, (draw_info.width - cache_text.get_width() - 10, 30))
+
+    if len(draw_info.lst) and draw_info.bar_width < draw_info.LOD_BAR_WIDTH:
+        plot = draw_list_lod
+    elif len(draw_info.lst) and draw_info.bar_width < draw_info.VECTOR_BAR_WIDTH:
+        plot = draw_list_vectorized
+    else:
+        plot = draw_list
+    if draw_info.full_redraw:
+        plot(draw_info, color_positions)
+        pygame.display.update()
+    else:
+        pygame.display.update([header_rect] + plot(draw_info, color_positions))
 
 def draw_list(draw_info, color_positions):
+    """Draw the bars and return the dirty rectangles.
+
+    Only columns that are highlighted now or were highlighted last frame are
+    repainted, since every step highlights the indices it moved. A reset,
+    resize or seek sets full_redraw and repaints everything instead."""
     lst = draw_info.lst
-    
-    clear_rect = (draw_info.SIDE_PAD//2, draw_info.TOP_PAD, 
-                  draw_info.width - draw_info.SIDE_PAD, draw_info.height - draw_info.TOP_PAD)
-    pygame.draw.rect(draw_info.window, draw_info.BACKGROUND_COLOR, clear_rect)
+    highlighted = set(color_positions)
+    dirty = highlighted | draw_info.drawn_highlights
+    draw_info.drawn_highlights = highlighted
 
-    for i, val in enumerate(lst):
+    full = draw_info.full_redraw or 2 * len(dirty) > len(lst)
+    if full:
+        # block_width is rounded, so the bars can run past the plot area
+        plot_width = max(draw_info.width - draw_info.SIDE_PAD, len(lst) * draw_info.block_width)
+        clear_rect = pygame.Rect(draw_info.SIDE_PAD//2, draw_info.TOP_PAD,
+                                 plot_width, draw_info.height - draw_info.TOP_PAD)
+        pygame.draw.rect(draw_info.window, draw_info.BACKGROUND_COLOR, clear_rect)
+        dirty = range(len(lst))
+        rects = [clear_rect]
+        draw_info.full_redraw = False
+    else:
+        rects = []
+
+    for i in dirty:
         x = draw_info.start_x + i * draw_info.block_width
-        height_val = (val - draw_info.min_val) * draw_info.block_height_unit
+        height_val = (lst[i] - draw_info.min_val) * draw_info.block_height_unit
         y = draw_info.height - height_val
         
         color = draw_info.GRADIENTS[i % 3]
         if i in color_positions:
             color = color_positions[i]
-            
+
+        if not full:
+            column = pygame.Rect(x, draw_info.TOP_PAD, draw_info.block_width, draw_info.height - draw_info.TOP_PAD)
+            pygame.draw.rect(draw_info.window, draw_info.BACKGROUND_COLOR, column)
+            rects.append(column)
         pygame.draw.rect(draw_info.window, color, (x, y, draw_info.block_width, height_val))
+    return rects
+
+def split_highlights(color_positions):
+    """Return ({index: color}, ColorRange or None) for any highlight mapping"""
+    if isinstance(color_positions, steps.HighlightSet):
+        return color_positions.points, color_positions.range
+    if isinstance(color_positions, steps.ColorRange):
+        return {}, color_positions
+    return color_positions, None
+
+def _map_colors(surface, colors):
+    """Vectorized Surface.map_rgb for an (n, 3) uint8 array"""
+    shifts = surface.get_shifts()
+    colors = colors.astype(np.uint32)
+    return (colors[:, 0] << shifts[0]) | (colors[:, 1] << shifts[1]) | (colors[:, 2] << shifts[2])
+
+def draw_list_vectorized(draw_info, color_positions):
+    """Render the bars with NumPy into a pixel buffer and return the dirty rect.
+
+    Every pixel column is mapped to the element under it, so bars can be any
+    fraction of a pixel wide. Highlighted elements claim the columns they fall
+    in, so activity stays visible even when many elements share a pixel."""
+    lst = draw_info.lst
+    n = len(lst)
+    plot_w = draw_info.width - draw_info.SIDE_PAD
+    plot_h = draw_info.height - draw_info.TOP_PAD
+    if draw_info.plot_surface is None or draw_info.plot_surface.get_size() != (plot_w, plot_h):
+        draw_info.plot_surface = pygame.Surface((plot_w, plot_h), depth=32)
+
+    xs = np.arange(plot_w)
+    cols = xs * n // plot_w
+    colors = np.array(draw_info.GRADIENTS, dtype=np.uint8)[cols % 3]
+
+    points, color_range = split_highlights(color_positions)
+    if color_range is not None:
+        lo = color_range.lo * plot_w // n
+        hi = -(-color_range.hi * plot_w // n)
+        colors[lo:hi] = color_range.color
+    if points:
+        idx = np.fromiter(points.keys(), dtype=np.int64, count=len(points))
+        point_colors = np.array(list(points.values()), dtype=np.uint8).reshape(-1, 3)
+        lo = idx * plot_w // n
+        widths = np.maximum((idx + 1) * plot_w // n - lo, 1)
+        offsets = np.arange(widths.sum()) - np.repeat(np.cumsum(widths) - widths, widths)
+        hit = np.minimum(np.repeat(lo, widths) + offsets, plot_w - 1)
+        cols[hit] = np.repeat(idx, widths)
+        colors[hit] = np.repeat(point_colors, widths, axis=0)
+
+    values = np.asarray(lst, dtype=np.float64)[cols]
+    heights = np.clip((values - draw_info.min_val) * draw_info.block_height_unit, 0, plot_h)
+    filled = np.arange(plot_h)[None, :] >= (plot_h - heights)[:, None]
+    # Pack to one mapped int per pixel so the fill touches a third of the bytes
+    surface = draw_info.plot_surface
+    mapped = _map_colors(surface, colors)
+    background = surface.map_rgb(draw_info.BACKGROUND_COLOR)
+    return _blit_columns(draw_info, np.where(filled, mapped[:, None], np.uint32(background)))
+
+def _blit_columns(draw_info, columns):
+    """Blit a (plot_w, plot_h) array of mapped colors to the plot area"""
+    plot_w, plot_h = columns.shape
+    plot_rect = pygame.Rect(draw_info.start_x, draw_info.TOP_PAD, plot_w, plot_h)
+    pygame.surfarray.blit_array(draw_info.plot_surface, columns)
+    draw_info.window.blit(draw_info.plot_surface, plot_rect)
+    draw_info.full_redraw = False
+    draw_info.drawn_highlights = set()
+    return [plot_rect]
+
+def draw_list_lod(draw_info, color_positions):
+    """Render one aggregated column per pixel and return the dirty rect.
 
-def main():
+    Each column shows the mean of its elements as a bar and their min..max
+    spread as a band. The aggregates are only rebuilt on a full redraw;
+    otherwise the highlighted indices, which cover every index moved since
+    the last frame, are folded in incrementally."""
+    lst = draw_info.lst
+    plot_w = draw_info.width - draw_info.SIDE_PAD
+    plot_h = draw_info.height - draw_info.TOP_PAD
+    if draw_info.plot_surface is None or draw_info.plot_surface.get_size() != (plot_w, plot_h):
+        draw_info.plot_surface = pygame.Surface((plot_w, plot_h), depth=32)
+
+    points, color_range = split_highlights(color_positions)
+    lod = draw_info.lod
+    if draw_info.full_redraw or lod is None or lod.columns != plot_w or lod.n != len(lst):
+        lod = draw_info.lod = ColumnAggregates(lst, plot_w)
+    else:
+        lod.update(lst, points)
+
+    xs = np.arange(plot_w)
+    colors = np.array(draw_info.GRADIENTS, dtype=np.uint8)[xs % 3]
+    if color_range is not None:
+        lo, hi = lod.column_of([color_range.lo, max(color_range.hi - 1, color_range.lo)])
+        colors[lo:hi + 1] = color_range.color
+    if points:
+        cols = lod.column_of(np.fromiter(points.keys(), dtype=np.int64, count=len(points)))
+        colors[cols] = np.array(list(points.values()), dtype=np.uint8).reshape(-1, 3)
+
+    def to_height(values):
+        return np.clip((values - draw_info.min_val) * draw_info.block_height_unit, 0, plot_h)
+
+    ys = np.arange(plot_h)[None, :]
+    surface = draw_info.plot_surface
+    pixels = np.full((plot_w, plot_h), surface.map_rgb(draw_info.BACKGROUND_COLOR), dtype=np.uint32)
+    band = (ys >= (plot_h - to_height(lod.max))[:, None]) & (ys < (plot_h - to_height(lod.min))[:, None])
+    pixels[band] = surface.map_rgb(draw_info.LOD_BAND_COLOR)
+    bar = ys >= (plot_h - to_height(lod.mean))[:, None]
+    pixels = np.where(bar, _map_colors(surface, colors)[:, None], pixels)
+    return _blit_columns(draw_info, pixels)
+
+def draw_message(draw_info, text):
+    message = draw_info.LARGE_FONT.render(text, 1, draw_info.BLACK, draw_info.BACKGROUND_COLOR)
+    draw_info.window.blit(message, (draw_info.width/2 - message.get_width()/2, draw_info.height/2))
+    pygame.display.update()
+
+def open_replay(path, draw_info):
+    player = sort_trace.TracePlayer(sort_trace.Trace(path))
+    draw_info.set_list(player.arr)
+    return player
+
+def close_replay(player, draw_info, delete=False):
+    initial = buffers.compact_if_large(player.trace.initial)
+    path = player.trace.path
+    player.trace.close()
+    if delete:
+        os.remove(path)
+    draw_info.set_list(initial)
+
+def main(trace_path=None):
     pygame.init() 
     run = True
     clock = pygame.time.Clock()
@@ -98,8 +310,9 @@ def main():
     n = 50
     min_val = 0
     max_val = 100
+    workload = 'uniform'  # W cycles through workloads.WORKLOAD_NAMES
 
-    lst = create_starting_list(n, min_val, max_val)
+    lst = create_starting_list(n, min_val, max_val, workload)
     draw_info = DrawInformation(800, 600, lst)
     
     sorting = False
@@ -107,37 +320,121 @@ def main():
 
     sorting_algorithm = sort_algos.bubble_sort
     sorting_algo_name = "Bubble Sort"
-    sorting_algorithm_generator = None
+    scheduler = None
+    speed = 1.0  # steps per frame, UP/DOWN doubles/halves
+    cache = trace_cache.get_cache()  # finished runs, replayed when the same array is sorted again
 
     start_time = 0
     elapsed_time = 0
     color_positions = {}
 
+    # Replay of a recorded trace
+    player = None
+    player_owns_file = False
+    replay_paused = False
+    replay_budget = 0.0
+    recording = None  # T records on a worker thread; ESC cancels
+    if trace_path:
+        player = open_replay(trace_path, draw_info)
+
     while run:
         clock.tick(180) #tick rate
 
-        if sorting:
-            try:
-                draw_info.lst, color_positions = next(sorting_algorithm_generator)
-                elapsed_time = time.time() - start_time
-            except StopIteration:
+        if recording is not None:
+            if recording.done:
+                if recording.error is not None:
+                    print(f"Recording failed: {recording.error}")
+                    os.remove(recording.path)
+                    draw_info.invalidate()
+                else:
+                    player = open_replay(recording.path, draw_info)
+                    player_owns_file = True
+                    replay_paused = False
+                    replay_budget = 0.0
+                    color_positions = {}
+                recording = None
+            else:
+                draw_message(draw_info, f"Recording {sorting_algo_name}... {recording.steps:,} steps (ESC to cancel)")
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        run = False
+                    if not run or event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                        recording.cancel()
+                        recording = None
+                        draw_info.invalidate()
+                        break
+                continue
+
+        if player is not None:
+            if not replay_paused and not player.finished:
+                replay_budget += speed
+                count = int(replay_budget)
+                replay_budget -= count
+                if count:
+                    color_positions = player.forward(count, FRAME_TIME_BUDGET)
+            elif player.finished:
+                color_positions = {}
+        elif sorting:
+            highlights = scheduler.advance()
+            if highlights is not None:
+                color_positions = highlights
+            elapsed_time = time.time() - start_time
+            if scheduler.finished:
+                # Only highlighted columns get repainted, so repaint everything
+                # once the last frame's steps are dropped with the highlights
+                draw_info.invalidate()
                 sorting = False
                 color_positions = {}
         
         # Pass sorting to the draw function
-        draw(draw_info, sorting_algo_name, ascending, elapsed_time, color_positions, sorting)
+        draw(draw_info, sorting_algo_name, ascending, elapsed_time, color_positions, sorting,
+             player, speed, None if player is not None else workload, cache)
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
 
+            if event.type == pygame.VIDEORESIZE:
+                draw_info.resize(event.w, event.h)
+
             if event.type != pygame.KEYDOWN:
                 continue
 
             if event.key == pygame.K_ESCAPE:
+                if player is not None:
+                    close_replay(player, draw_info, player_owns_file)
                 return "exit" 
-            elif event.key == pygame.K_r:
-                lst = create_starting_list(n, min_val, max_val)
+
+            if player is not None:
+                if event.key == pygame.K_SPACE:
+                    if player.finished:
+                        player.seek(0)
+                        draw_info.invalidate()
+                        replay_paused = False
+                    else:
+                        replay_paused = not replay_paused
+                elif event.key == pygame.K_RIGHT:
+                    replay_paused = True
+                    color_positions = player.forward(1)
+                elif event.key == pygame.K_LEFT:
+                    replay_paused = True
+                    color_positions = player.back(1)
+                    draw_info.invalidate()
+                elif event.key == pygame.K_UP:
+                    speed = min(speed * 2, MAX_SPEED)
+                elif event.key == pygame.K_DOWN:
+                    speed = max(speed / 2, MIN_SPEED)
+                elif pygame.K_0 <= event.key <= pygame.K_9:
+                    color_positions = player.jump_to_fraction((event.key - pygame.K_0) / 10)
+                    draw_info.invalidate()
+                elif event.key == pygame.K_e or event.key == pygame.K_r:
+                    close_replay(player, draw_info, player_owns_file)
+                    player = None
+                    color_positions = {}
+                continue
+
+            if event.key == pygame.K_r:
+                lst = create_starting_list(n, min_val, max_val, workload)
                 draw_info.set_list(lst)
                 sorting = False
                 elapsed_time = 0
@@ -150,11 +447,42 @@ def main():
                 else: # 
                     sorting = True
                     start_time = time.time()
-                    sorting_algorithm_generator = sorting_algorithm(draw_info.lst, ascending)
+                    step_iter = cache.steps(sorting_algo_name, sorting_algorithm, draw_info.lst, ascending)
+                    scheduler = steps.StepScheduler(step_iter, draw_info.lst, speed, FRAME_TIME_BUDGET)
+
+            elif event.key == pygame.K_UP:
+                speed = min(speed * 2, MAX_SPEED)
+                if scheduler is not None:
+                    scheduler.speed = speed
+            elif event.key == pygame.K_DOWN:
+                speed = max(speed / 2, MIN_SPEED)
+                if scheduler is not None:
+                    scheduler.speed = speed
+
+            elif event.key == pygame.K_f and sorting:
+                scheduler.finish()
+                draw_info.invalidate()
+                elapsed_time = time.time() - start_time
+                sorting = False
+                color_positions = {}
                     
             # Only run when not sorting
             elif not sorting:
-                if event.key == pygame.K_a:
+                if event.key == pygame.K_t:
+                    recording = sort_trace.BackgroundRecording(sorting_algorithm(draw_info.lst, ascending),
+                                                               draw_info.lst, sort_trace.temp_trace_path())
+                elif event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_MINUS, pygame.K_w):
+                    if event.key == pygame.K_MINUS:
+                        n = max(n // 2, MIN_SIZE)
+                    elif event.key == pygame.K_w:
+                        workload = workloads.next_workload(workload)
+                    else:
+                        n = min(n * 2, MAX_SIZE)
+                    lst = create_starting_list(n, min_val, max_val, workload)
+                    draw_info.set_list(lst)
+                    elapsed_time = 0
+                    color_positions = {}
+                elif event.key == pygame.K_a:
                     ascending = True
                 elif event.key == pygame.K_d:
                     ascending = False
@@ -167,15 +495,27 @@ def main():
                 elif event.key == pygame.K_m:
                     sorting_algorithm = sort_algos.merge_sort
                     sorting_algo_name = "Merge Sort"
+                elif event.key == pygame.K_k:
+                    sorting_algorithm = sort_algos.tim_sort
+                    sorting_algo_name = "Tim Sort"
                 elif event.key == pygame.K_q:
                     sorting_algorithm = sort_algos.quick_sort
                     sorting_algo_name = "Quick Sort"
+                elif event.key == pygame.K_n:
+                    sorting_algorithm = sort_algos.intro_sort
+                    sorting_algo_name = "Intro Sort"
                 elif event.key == pygame.K_h:
                     sorting_algorithm = sort_algos.heap_sort
                     sorting_algo_name = "Heap Sort"
+                elif event.key == pygame.K_g:
+                    sorting_algorithm = sort_algos.floyd_heap_sort
+                    sorting_algo_name = "Floyd Heap Sort"
                 elif event.key == pygame.K_x:
                     sorting_algorithm = sort_algos.radix_sort
                     sorting_algo_name = "Radix Sort"
+                elif event.key == pygame.K_z:
+                    sorting_algorithm = sort_algos.msd_radix_sort
+                    sorting_algo_name = "MSD Radix Sort"
                 elif event.key == pygame.K_u:
                     sorting_algorithm = sort_algos.bucket_sort
                     sorting_algo_name = "Bucket Sort"
@@ -186,8 +526,10 @@ def main():
                     sorting_algorithm = sort_algos.counting_sort
                     sorting_algo_name = "Counting Sort"
     
+    if player is not None:
+        close_replay(player, draw_info, player_owns_file)
     pygame.quit()
     return "exit"
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
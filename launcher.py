@@ -22,6 +22,7 @@ class Launcher:
         self.options = [
             ("Individual Algorithm Visualization", "individual_sorting.py"),
             ("Algorithm Comparison Mode", "algorithm_comparison.py"),
+            ("External Sort Visualization", "external_sort_view.py"),
             ("Exit", None)
         ]
         
@@ -97,6 +98,9 @@ class Launcher:
                             elif result == "algorithm_comparison.py":
                                 import algorithm_comparison
                                 algorithm_comparison.main()
+                            elif result == "external_sort_view.py":
+                                import external_sort_view
+                                external_sort_view.main()
                             # Return to launcher after program exits
                             pygame.init()
                             self.__init__()
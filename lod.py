@@ -0,0 +1,62 @@
+"""Level-of-detail summaries for arrays with more elements than pixel columns.
+
+Element i belongs to column i * columns // n. Each column keeps the min, max
+and sum of its elements, and writes update them incrementally: the sum is
+adjusted by the difference, a new extreme just replaces min/max, and only a
+column that loses its current min or max is rescanned (O(n / columns)). A
+frame therefore costs O(columns + changes) instead of O(n).
+"""
+import numpy as np
+
+
+class ColumnAggregates:
+
+    def __init__(self, lst, columns):
+        self.columns = columns
+        self.rebuild(lst)
+
+    def rebuild(self, lst):
+        """Recompute every column from scratch, e.g. after a reset or seek"""
+        self.values = np.array(lst, dtype=np.int64)
+        self.n = n = len(self.values)
+        if n < self.columns:
+            raise ValueError("ColumnAggregates needs at least one element per column")
+        # First element of column c is ceil(c * n / columns)
+        self.starts = (np.arange(self.columns, dtype=np.int64) * n + self.columns - 1) // self.columns
+        self.ends = np.append(self.starts[1:], n)
+        self.counts = self.ends - self.starts
+        self.min = np.minimum.reduceat(self.values, self.starts)
+        self.max = np.maximum.reduceat(self.values, self.starts)
+        self.sum = np.add.reduceat(self.values, self.starts)
+
+    def column_of(self, indices):
+        return np.asarray(indices, dtype=np.int64) * self.columns // self.n
+
+    def update(self, lst, indices):
+        """Bring the columns up to date with lst at the given indices, which
+        must include every index written since the last update (repeats are fine)"""
+        if not len(indices):
+            return
+        idx = np.unique(np.fromiter(indices, dtype=np.int64, count=len(indices)))
+        new = np.fromiter((lst[i] for i in idx.tolist()), dtype=np.int64, count=len(idx))
+        old = self.values[idx]
+        changed = new != old
+        if not changed.any():
+            return
+        idx, new, old = idx[changed], new[changed], old[changed]
+        cols = idx * self.columns // self.n
+
+        # Columns whose current extreme is being overwritten need a rescan
+        lost_extreme = (old == self.min[cols]) | (old == self.max[cols])
+        self.values[idx] = new
+        np.add.at(self.sum, cols, new - old)
+        np.minimum.at(self.min, cols, new)
+        np.maximum.at(self.max, cols, new)
+        for c in np.unique(cols[lost_extreme]).tolist():
+            segment = self.values[self.starts[c]:self.ends[c]]
+            self.min[c] = segment.min()
+            self.max[c] = segment.max()
+
+    @property
+    def mean(self):
+        return self.sum / self.counts
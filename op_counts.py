@@ -0,0 +1,93 @@
+"""Operation counts for the sort_algos visual generators.
+
+Counts are derived from the step stream (see steps.py): every COMPARE, SWAP
+and WRITE a generator yields is tallied, and a swap counts as two element
+moves. Nothing is counted unless a stream is wrapped with counted(), so the
+normal paths pay nothing for it.
+
+Peak auxiliary memory cannot be seen in the step stream, so peak_aux_bytes()
+gets it from tracemalloc in a separate run: the highest allocation seen while
+the sort ran, minus what was allocated before it started.
+"""
+import tracemalloc
+
+from steps import COMPARE, SWAP, WRITE, OP_NAMES
+
+
+class OpCounts:
+
+    __slots__ = ('tally', 'peak_aux_bytes')
+
+    def __init__(self):
+        self.tally = [0] * len(OP_NAMES)  # indexed by step op
+        self.peak_aux_bytes = None
+
+    @property
+    def compares(self):
+        return self.tally[COMPARE]
+
+    @property
+    def swaps(self):
+        return self.tally[SWAP]
+
+    @property
+    def writes(self):
+        return self.tally[WRITE]
+
+    @property
+    def moves(self):
+        return self.tally[WRITE] + 2 * self.tally[SWAP]
+
+    def snapshot(self):
+        """A picklable copy of the tally, e.g. to send between processes"""
+        return tuple(self.tally)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        counts = cls()
+        counts.tally[:] = snapshot
+        return counts
+
+    def as_dict(self):
+        return {
+            'compares': self.compares,
+            'swaps': self.swaps,
+            'writes': self.writes,
+            'moves': self.moves,
+            'peak_aux_bytes': self.peak_aux_bytes,
+        }
+
+    def __repr__(self):
+        return (f"OpCounts(compares={self.compares}, swaps={self.swaps}, writes={self.writes}, "
+                f"peak_aux_bytes={self.peak_aux_bytes})")
+
+
+def counted(step_iter, counts):
+    """Pass step_iter through unchanged while tallying its ops into counts.
+    The generator's return value is passed on as well."""
+    tally = counts.tally
+    it = iter(step_iter)
+    while True:
+        try:
+            step = next(it)
+        except StopIteration as stop:
+            return stop.value
+        tally[step[0]] += 1
+        yield step
+
+
+def peak_aux_bytes(func, *args):
+    """Run func(*args) under tracemalloc and return its peak extra allocation"""
+    was_tracing = tracemalloc.is_tracing()
+    if was_tracing:
+        tracemalloc.reset_peak()  # Python 3.9+
+    else:
+        tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        func(*args)
+        return max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
@@ -0,0 +1,245 @@
+"""Multi-process sorting engines.
+
+Both engines keep the array in multiprocessing.shared_memory int64 buffers
+that the pool workers attach to by name, so only offsets and small arrays
+of counts or cut positions travel over the pool's pipes:
+
+    Parallel Merge Sort   each worker sorts one contiguous chunk; the sorted
+                          chunks are then cut at exact output ranks and each
+                          worker merges one slice of every chunk
+    Sample Sort           splitters are picked from a random sample, every
+                          worker partitions its block by splitter, then each
+                          worker gathers one bucket from all blocks and sorts it
+
+The pool is started on first use and kept for later calls with the same
+worker count. Kernels take (arr, ascending=True, workers=None), like the
+raw kernels in sort_algos, and return an int64 ndarray. Inputs shorter than
+min_size are sorted in-process.
+
+Worker tasks are this module's top-level functions, so a spawned worker
+only needs to import this module and NumPy.
+"""
+import atexit
+import multiprocessing as mp
+import os
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+PARALLEL_MIN_SIZE = 1 << 14  # below this, sorting in-process beats the pool round trips
+SAMPLE_OVERSAMPLING = 32  # sample elements per bucket when picking splitters
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers):
+    """The shared pool, restarted when the worker count changes"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.terminate()
+            _pool = mp.get_context('spawn').Pool(workers)
+            _pool_workers = workers
+        return _pool
+
+
+def warm_up(workers):
+    """Start the pool and wait until every worker has run a task, so the
+    first timed sort does not pay for spawning it"""
+    get_pool(workers).map(abs, range(workers), chunksize=1)
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.terminate()
+            _pool.join()
+            _pool = None
+
+
+atexit.register(shutdown)
+
+
+def _attach(name, n):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+
+
+def _sort_chunk(name, n, lo, hi):
+    shm, a = _attach(name, n)
+    try:
+        a[lo:hi].sort()
+    finally:
+        a = None  # release the buffer before closing
+        shm.close()
+
+
+def _merge_slices(src_name, dst_name, n, slices, out_lo):
+    """Merge sorted src slices into dst[out_lo:]. NumPy's stable sort is a
+    timsort, which merges the already sorted slices as runs."""
+    src_shm, src = _attach(src_name, n)
+    dst_shm, dst = _attach(dst_name, n)
+    try:
+        part = np.concatenate([src[lo:hi] for lo, hi in slices])
+        part.sort(kind='stable')
+        dst[out_lo:out_lo + len(part)] = part
+    finally:
+        src = dst = None
+        src_shm.close()
+        dst_shm.close()
+
+
+def _partition_block(name, n, lo, hi, splitters):
+    """Reorder src[lo:hi] by bucket and return the size of each bucket"""
+    shm, a = _attach(name, n)
+    try:
+        block = a[lo:hi]
+        ids = np.searchsorted(splitters, block, side='right')
+        block[:] = block[np.argsort(ids, kind='stable')]
+        return np.bincount(ids, minlength=len(splitters) + 1)
+    finally:
+        block = a = None
+        shm.close()
+
+
+def _sort_bucket(src_name, dst_name, n, pieces, out_lo):
+    """Gather one bucket's pieces from every block into dst[out_lo:] and sort it"""
+    src_shm, src = _attach(src_name, n)
+    dst_shm, dst = _attach(dst_name, n)
+    try:
+        out_hi = out_lo + sum(hi - lo for lo, hi in pieces)
+        bucket = dst[out_lo:out_hi]
+        pos = 0
+        for lo, hi in pieces:
+            bucket[pos:pos + hi - lo] = src[lo:hi]
+            pos += hi - lo
+        bucket.sort()
+    finally:
+        bucket = src = dst = None
+        src_shm.close()
+        dst_shm.close()
+
+
+def _bounds(n, parts):
+    return [n * t // parts for t in range(parts + 1)]
+
+
+def _rank_cuts(chunks, rank):
+    """Cut position in each sorted chunk such that the prefixes together hold
+    the `rank` smallest elements. Equal values go to earlier chunks first."""
+    if rank == 0:
+        return [0] * len(chunks)
+    # Smallest value v with at least `rank` elements <= v
+    lo = min(int(c[0]) for c in chunks if len(c))
+    hi = max(int(c[-1]) for c in chunks if len(c))
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if sum(int(np.searchsorted(c, mid, side='right')) for c in chunks) >= rank:
+            hi = mid
+        else:
+            lo = mid + 1
+    cuts = [int(np.searchsorted(c, lo, side='left')) for c in chunks]
+    remaining = rank - sum(cuts)
+    for i, c in enumerate(chunks):
+        take = min(remaining, int(np.searchsorted(c, lo, side='right')) - cuts[i])
+        cuts[i] += take
+        remaining -= take
+    return cuts
+
+
+def _finish(out, ascending):
+    return out if ascending else out[::-1].copy()
+
+
+def _shared_pair(data):
+    """Shared memory blocks for the input (holding data) and the output"""
+    size = max(data.nbytes, 1)
+    src = shared_memory.SharedMemory(create=True, size=size)
+    dst = shared_memory.SharedMemory(create=True, size=size)
+    np.ndarray(data.shape, dtype=np.int64, buffer=src.buf)[:] = data
+    return src, dst
+
+
+def _release(*blocks):
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+
+def parallel_merge_sort(arr, ascending=True, workers=None, min_size=PARALLEL_MIN_SIZE):
+    data = np.array(arr, dtype=np.int64)
+    n = len(data)
+    workers = min(workers or DEFAULT_WORKERS, max(n, 1))
+    if workers == 1 or n < min_size:
+        data.sort()
+        return _finish(data, ascending)
+
+    pool = get_pool(workers)
+    src, dst = _shared_pair(data)
+    try:
+        bounds = _bounds(n, workers)
+        pool.starmap(_sort_chunk, [(src.name, n, bounds[t], bounds[t + 1]) for t in range(workers)])
+
+        # Merge path over all chunks: worker t produces output ranks bounds[t]:bounds[t + 1]
+        shared = np.ndarray((n,), dtype=np.int64, buffer=src.buf)
+        chunks = [shared[bounds[t]:bounds[t + 1]] for t in range(workers)]
+        cuts = [_rank_cuts(chunks, rank) for rank in bounds]
+        chunks = shared = None
+        tasks = []
+        for t in range(workers):
+            slices = [(bounds[c] + cuts[t][c], bounds[c] + cuts[t + 1][c]) for c in range(workers)]
+            tasks.append((src.name, dst.name, n, slices, bounds[t]))
+        pool.starmap(_merge_slices, tasks)
+
+        out = np.ndarray((n,), dtype=np.int64, buffer=dst.buf).copy()
+    finally:
+        _release(src, dst)
+    return _finish(out, ascending)
+
+
+def sample_sort(arr, ascending=True, workers=None, min_size=PARALLEL_MIN_SIZE, seed=0):
+    data = np.array(arr, dtype=np.int64)
+    n = len(data)
+    workers = min(workers or DEFAULT_WORKERS, max(n, 1))
+    if workers == 1 or n < min_size:
+        data.sort()
+        return _finish(data, ascending)
+
+    # Every SAMPLE_OVERSAMPLING-th element of a sorted random sample
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(data, size=min(n, workers * SAMPLE_OVERSAMPLING), replace=False))
+    splitters = sample[SAMPLE_OVERSAMPLING::SAMPLE_OVERSAMPLING][:workers - 1]
+
+    pool = get_pool(workers)
+    src, dst = _shared_pair(data)
+    try:
+        bounds = _bounds(n, workers)
+        counts = pool.starmap(_partition_block, [(src.name, n, bounds[t], bounds[t + 1], splitters)
+                                                 for t in range(workers)])
+        counts = np.array(counts)  # counts[block][bucket]
+
+        # Bucket b lands at the total size of the buckets before it
+        starts = np.concatenate(([0], np.cumsum(counts.sum(axis=0))[:-1]))
+        offsets = np.concatenate((np.zeros((workers, 1), dtype=np.int64), np.cumsum(counts, axis=1)), axis=1)
+        tasks = []
+        for b in range(len(splitters) + 1):
+            pieces = [(bounds[t] + int(offsets[t][b]), bounds[t] + int(offsets[t][b + 1])) for t in range(workers)]
+            tasks.append((src.name, dst.name, n, pieces, int(starts[b])))
+        pool.starmap(_sort_bucket, tasks)
+
+        out = np.ndarray((n,), dtype=np.int64, buffer=dst.buf).copy()
+    finally:
+        _release(src, dst)
+    return _finish(out, ascending)
+
+
+PARALLEL_SORTS = {
+    'Parallel Merge Sort': parallel_merge_sort,
+    'Sample Sort': sample_sort,
+}
@@ -0,0 +1,138 @@
+"""Process-based backend for comparison mode.
+
+Each algorithm runs in its own process so the race is not serialized by the
+GIL. The input array is placed once in shared memory and every worker attaches
+to it instead of receiving a pickled copy. Progress and final timings are
+streamed back over a queue as (kind, name, seconds, steps, ops) tuples, where
+ops is an op_counts snapshot when counting is on and None otherwise; cancel()
+stops the workers.
+
+This module does not import pygame, so spawned workers stay lightweight.
+"""
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import op_counts
+import sort_algos
+
+PROGRESS_INTERVAL = 0.02  # seconds between progress messages per worker
+CHECK_EVERY = 256  # steps between cancel checks (must be a power of two)
+
+
+def _worker(name, func, shm_name, size, raw, results, cancel, ready, interval, count_ops=False):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        shared = np.ndarray((size,), dtype=np.int64, buffer=shm.buf)
+        lst = shared.copy() if name in sort_algos.NDARRAY_SORTS else shared.tolist()
+    finally:
+        shm.close()
+
+    try:
+        ready.wait(timeout=30)
+    except Exception:
+        pass  # a broken barrier only costs us a fair start
+
+    counts = op_counts.OpCounts() if count_ops and not raw else None
+
+    def snapshot():
+        return None if counts is None else counts.snapshot()
+
+    steps = 0
+    start = time.perf_counter()
+    try:
+        if raw:
+            func(lst, True)
+        else:
+            step_iter = func(lst, True)  # Always ascending
+            if counts is not None:
+                step_iter = op_counts.counted(step_iter, counts)
+            next_report = start + interval
+            for _ in step_iter:
+                steps += 1
+                if steps & (CHECK_EVERY - 1) == 0:
+                    if cancel.is_set():
+                        results.put(('cancelled', name, time.perf_counter() - start, steps, snapshot()))
+                        return
+                    now = time.perf_counter()
+                    if now >= next_report:
+                        results.put(('progress', name, now - start, steps, snapshot()))
+                        next_report = now + interval
+        results.put(('done', name, time.perf_counter() - start, steps, snapshot()))
+    except Exception as e:
+        results.put(('error', name, repr(e), steps, snapshot()))
+
+
+class ProcessRace:
+    """Runs every algorithm on its own process over a shared input array"""
+
+    def __init__(self, algorithms, lst, raw=False, interval=PROGRESS_INTERVAL, count_ops=False):
+        self.algorithms = algorithms
+        self.lst = lst
+        self.raw = raw
+        self.interval = interval
+        self.count_ops = count_ops
+        self.ctx = mp.get_context('spawn')
+        self.results = None
+        self.cancel_event = None
+        self.ready = None
+        self.processes = {}
+        self.shm = None
+
+    def start(self):
+        data = np.asarray(self.lst, dtype=np.int64)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+        np.ndarray(data.shape, dtype=np.int64, buffer=self.shm.buf)[:] = data
+
+        self.results = self.ctx.Queue()
+        self.cancel_event = self.ctx.Event()
+        # Held on self: spawned children unpickle these after start() returns
+        self.ready = self.ctx.Barrier(len(self.algorithms))
+
+        for name, func in self.algorithms.items():
+            process = self.ctx.Process(
+                target=_worker,
+                args=(name, func, self.shm.name, len(data), self.raw,
+                      self.results, self.cancel_event, self.ready, self.interval, self.count_ops),
+                daemon=True
+            )
+            process.start()
+            self.processes[name] = process
+        return self
+
+    def poll(self, max_messages=1000):
+        """Return the messages received since the last call without blocking"""
+        messages = []
+        if self.results is None:
+            return messages
+        try:
+            while len(messages) < max_messages:
+                messages.append(self.results.get_nowait())
+        except queue.Empty:
+            pass
+        return messages
+
+    def alive(self):
+        return any(p.is_alive() for p in self.processes.values())
+
+    def cancel(self, grace=0.2):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        deadline = time.time() + grace
+        for process in self.processes.values():
+            process.join(max(0, deadline - time.time()))
+        # Raw kernels never look at the cancel event, so stop stragglers hard
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.close()
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
@@ -0,0 +1,231 @@
+"""Empirical complexity checks for the sort_algos kernels.
+
+Times every algorithm over a geometric ladder of sizes for each workload and
+fits log(time) = exponent * log(n) + c. Each result gets:
+
+    exponent    slope of the log-log fit
+    constant    geometric mean of time / model(n) in ns, where model is the
+                algorithm's expected class (n log n when it has none)
+
+Algorithms with a known class fail when their exponent exceeds the class's
+exponent plus EXPONENT_SLACK. With --baseline, a run also fails when an
+exponent grew by more than --exponent-tol or a constant by more than
+--constant-tol (relative) against the stored results.
+
+    python scaling.py --write-baseline scaling_baseline.json
+    python scaling.py --baseline scaling_baseline.json
+"""
+import argparse
+import json
+import math
+import sys
+
+import numpy as np
+
+import benchmark
+import workloads
+
+# Upper bounds on the growth class of each algorithm. These are worst-case
+# classes: an algorithm may well grow slower on a friendly workload.
+EXPECTED_CLASSES = {
+    'Bubble Sort': 'n^2',
+    'Insertion Sort': 'n^2',
+    'Selection Sort': 'n^2',
+    'Merge Sort': 'n log n',
+    'Tim Sort': 'n log n',
+    'Intro Sort': 'n log n',
+    'Heap Sort': 'n log n',
+    'Floyd Heap Sort': 'n log n',
+    'Counting Sort': 'n + k',
+}
+
+# class -> exponent of n it grows like
+CLASS_EXPONENTS = {'n^2': 2.0, 'n log n': 1.0, 'n + k': 1.0}
+# Allowed excess over the class exponent: covers the log factor, cache effects
+# and timer noise at small sizes
+EXPONENT_SLACK = 0.4
+
+# Run-to-run noise on a busy machine is about +-0.15 in exponent and +-25% in
+# constant, so the defaults leave room for that
+DEFAULT_EXPONENT_TOL = 0.25
+DEFAULT_CONSTANT_TOL = 0.5
+
+# Settings that change the fitted numbers; a baseline only compares with a
+# run that used the same ones (trials and warmup only change the noise)
+BASELINE_CONFIG_KEYS = ('variant', 'sizes', 'quadratic_max_size', 'min_val', 'max_val', 'seeds', 'workloads')
+
+
+def size_ladder(min_size, max_size, factor=2):
+    sizes = []
+    size = min_size
+    while size <= max_size:
+        sizes.append(size)
+        size *= factor
+    return sizes
+
+
+def model(complexity, n, k):
+    if complexity == 'n^2':
+        return n * n
+    if complexity == 'n + k':
+        return n + k
+    return n * math.log2(max(n, 2))
+
+
+def fit(sizes, times_ns, complexity, k):
+    """Return (exponent, constant) for times measured at sizes"""
+    exponent, _ = np.polyfit(np.log(sizes), np.log(times_ns), 1)
+    ratios = [t / model(complexity, n, k) for n, t in zip(sizes, times_ns)]
+    constant = math.exp(sum(math.log(r) for r in ratios) / len(ratios))
+    return float(exponent), constant
+
+
+def measure(algorithms, sizes, workload_names, seeds=(0, 1, 2), trials=5, warmup=1, min_val=0,
+            max_val=1000, variant='raw', quadratic_max_size=None, progress=None):
+    """Fit every algorithm on every workload; returns {workload: {algorithm: result}}.
+    O(n^2) algorithms skip the sizes above quadratic_max_size."""
+    k = max_val - min_val + 1
+    results = {}
+    for workload in workload_names:
+        fits = results[workload] = {}
+        for name, func in algorithms.items():
+            complexity = EXPECTED_CLASSES.get(name)
+            ladder = sizes
+            if complexity == 'n^2' and quadratic_max_size is not None:
+                ladder = [size for size in sizes if size <= quadratic_max_size] or sizes[:2]
+            rows = benchmark.benchmark({name: func}, ladder, seeds, trials, warmup, min_val, max_val,
+                                       variant=variant, workload_names=(workload,), progress=progress)
+            # The fastest trial is the least noisy estimate of the kernel's cost
+            times = [max(row['min_ns'], 1) for row in rows]
+            exponent, constant = fit(ladder, times, complexity, k)
+            fits[name] = {
+                'class': complexity,
+                'exponent': exponent,
+                'constant_ns': constant,
+                'sizes': ladder,
+                'min_ns': times,
+            }
+    return results
+
+
+def check(results, baseline=None, exponent_tol=DEFAULT_EXPONENT_TOL, constant_tol=DEFAULT_CONSTANT_TOL):
+    """Return a list of failure descriptions (empty when everything passes)"""
+    failures = []
+    for workload, fits in results.items():
+        for name, result in fits.items():
+            where = f"{name} on {workload}"
+            complexity = result['class']
+            if complexity is not None:
+                limit = CLASS_EXPONENTS[complexity] + EXPONENT_SLACK
+                if result['exponent'] > limit:
+                    failures.append(f"{where}: exponent {result['exponent']:.2f} exceeds "
+                                    f"{limit:.2f} for O({complexity})")
+
+            base = (baseline or {}).get(workload, {}).get(name)
+            if base is None:
+                continue
+            if result['exponent'] > base['exponent'] + exponent_tol:
+                failures.append(f"{where}: exponent {result['exponent']:.2f} regressed from "
+                                f"{base['exponent']:.2f} (tolerance {exponent_tol})")
+            if result['constant_ns'] > base['constant_ns'] * (1 + constant_tol):
+                failures.append(f"{where}: constant {result['constant_ns']:.4g} ns regressed from "
+                                f"{base['constant_ns']:.4g} ns (tolerance {constant_tol:.0%})")
+    return failures
+
+
+def format_table(results, baseline=None):
+    header = (f"{'Algorithm':<20} {'Workload':<13} {'Class':<8} {'Exponent':>8} "
+              f"{'Constant (ns)':>14} {'Base exp':>8} {'Base const':>11}")
+    lines = [header, '-' * len(header)]
+    for workload, fits in results.items():
+        for name, result in fits.items():
+            base = (baseline or {}).get(workload, {}).get(name)
+            base_exp = f"{base['exponent']:.2f}" if base else '-'
+            base_const = f"{base['constant_ns']:.4g}" if base else '-'
+            lines.append(f"{name:<20} {workload:<13} {result['class'] or '-':<8} {result['exponent']:>8.2f} "
+                         f"{result['constant_ns']:>14.4g} {base_exp:>8} {base_const:>11}")
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fit growth exponents of the sort_algos kernels")
+    parser.add_argument('--algorithms', nargs='*', default=None,
+                        help="Algorithms to run, e.g. bubble_sort merge_sort (default: all)")
+    parser.add_argument('--min-size', type=int, default=256)
+    parser.add_argument('--max-size', type=int, default=8192)
+    parser.add_argument('--factor', type=int, default=2, help="Ratio between consecutive sizes")
+    parser.add_argument('--quadratic-max-size', type=int, default=2048,
+                        help="Largest size for the O(n^2) algorithms")
+    parser.add_argument('--workloads', nargs='+', default=['uniform'],
+                        choices=workloads.WORKLOAD_NAMES + ['all'], metavar='WORKLOAD')
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0, 1, 2])
+    parser.add_argument('--trials', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--min-val', type=int, default=0)
+    parser.add_argument('--max-val', type=int, default=1000)
+    parser.add_argument('--variant', choices=sorted(benchmark.VARIANTS), default='raw')
+    parser.add_argument('--baseline', metavar='PATH', help="Fail on regressions against this baseline")
+    parser.add_argument('--write-baseline', metavar='PATH', help="Store this run as a baseline")
+    parser.add_argument('--exponent-tol', type=float, default=DEFAULT_EXPONENT_TOL,
+                        help="Allowed absolute growth of an exponent over the baseline")
+    parser.add_argument('--constant-tol', type=float, default=DEFAULT_CONSTANT_TOL,
+                        help="Allowed relative growth of a constant over the baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    algorithms = benchmark.resolve_algorithms(args.algorithms, args.variant)
+    workload_names = workloads.WORKLOAD_NAMES if 'all' in args.workloads else args.workloads
+    sizes = size_ladder(args.min_size, args.max_size, args.factor)
+    if len(sizes) < 2:
+        raise SystemExit("Need at least two sizes to fit an exponent")
+
+    def progress(row):
+        print(f"  {row['algorithm']:<20} {row['workload']:<13} n={row['size']:<8} "
+              f"min {row['min_ns'] / 1e6:.3f} ms", file=sys.stderr)
+
+    config = {
+        'sizes': sizes, 'quadratic_max_size': args.quadratic_max_size,
+        'seeds': args.seeds, 'trials': args.trials, 'warmup': args.warmup,
+        'min_val': args.min_val, 'max_val': args.max_val, 'variant': args.variant,
+        'workloads': workload_names,
+    }
+
+    # Check the baseline before measuring, so a mismatch fails fast
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        if stored['machine'] != benchmark.machine_info():
+            print("warning: baseline was recorded on a different machine or Python", file=sys.stderr)
+        mismatched = [key for key in BASELINE_CONFIG_KEYS if stored['config'].get(key) != config[key]]
+        if mismatched:
+            details = ', '.join(f"{key}: baseline {stored['config'].get(key)}, now {config[key]}"
+                                for key in mismatched)
+            raise SystemExit(f"Baseline was measured with a different configuration ({details})")
+        baseline = stored['results']
+
+    results = measure(algorithms, sizes, workload_names, args.seeds, args.trials, args.warmup,
+                      args.min_val, args.max_val, args.variant, args.quadratic_max_size, progress)
+
+    print(format_table(results, baseline))
+
+    if args.write_baseline:
+        report = {
+            'machine': benchmark.machine_info(),
+            'config': config,
+            'results': results,
+        }
+        with open(args.write_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    failures = check(results, baseline, args.exponent_tol, args.constant_tol)
+    for line in failures:
+        print(f"FAIL {line}")
+    print(f"{len(failures)} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,92 +1,378 @@
-import time
+import operator
 from typing import List
 
-# Highlighting Colors for Sorting
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-BLUE = (0, 0, 255)
-YELLOW = (255, 255, 0)
-PURPLE = (128, 0, 128)
+import numpy as np
+
+from buffers import like, working_copy, zeros_like
+from steps import COMPARE, SWAP, WRITE, MARK, RANGE
+from steps import RED, GREEN, YELLOW, PURPLE
 
 def bubble_sort(arr, ascending=True):
     n = len(arr)
-    local_arr = list(arr) 
+    local_arr = working_copy(arr) 
     for i in range(n):
         swapped = False
         for j in range(0, n - i - 1):
-            yield local_arr, {j: RED, j + 1: RED}
+            yield COMPARE, j, j + 1
             if (local_arr[j] > local_arr[j + 1] and ascending) or \
                (local_arr[j] < local_arr[j + 1] and not ascending):
                 local_arr[j], local_arr[j+1] = local_arr[j+1], local_arr[j]
                 swapped = True
-                yield local_arr, {j: GREEN, j + 1: GREEN}
+                yield SWAP, j, j + 1
         if not swapped:
             break
-    yield local_arr, {} 
+    return local_arr
 
 def insertion_sort(arr, ascending=True):
-    local_arr = list(arr)
+    local_arr = working_copy(arr)
     for i in range(1, len(local_arr)):
         key = local_arr[i]
         j = i - 1
-        
-        yield local_arr, {i: RED, j: RED} 
 
-        while j >= 0 and ((local_arr[j] > key and ascending) or \
-                          (local_arr[j] < key and not ascending)):
+        while j >= 0:
+            yield COMPARE, j, j + 1
+            if not ((local_arr[j] > key and ascending) or \
+                    (local_arr[j] < key and not ascending)):
+                break
             local_arr[j + 1] = local_arr[j]
+            yield WRITE, j + 1, local_arr[j]
             j -= 1
-            yield local_arr, {j + 1: RED, j: RED} 
         local_arr[j+1] = key
 
-        yield local_arr, {j+1: GREEN}
-    yield local_arr, {} 
+        yield WRITE, j + 1, key
+    return local_arr
+
+
+# Bottom-up merge sort: after a merge winner has taken this many elements in a
+# row, the rest of its streak is found with an exponential search instead
+MIN_GALLOP = 7
+
+
+def _gallop(seq, lo, hi, goes_first):
+    """Length of the prefix of seq[lo:hi] for which goes_first holds (it must
+    hold for a prefix and fail after it), found by probing at exponentially
+    growing offsets and binary searching the last gap"""
+    known = 0
+    bound = 1
+    while bound <= hi - lo and goes_first(seq[lo + bound - 1]):
+        known = bound
+        bound = 2 * bound + 1
+    top = min(bound - 1, hi - lo)
+    while known < top:
+        mid = (known + top + 1) // 2
+        if goes_first(seq[lo + mid - 1]):
+            known = mid
+        else:
+            top = mid - 1
+    return known
+
+
+def _gallop_back(seq, lo, hi, goes_last):
+    """_gallop from the right: length of the suffix of seq[lo:hi] for which
+    goes_last holds"""
+    known = 0
+    bound = 1
+    while bound <= hi - lo and goes_last(seq[hi - bound]):
+        known = bound
+        bound = 2 * bound + 1
+    top = min(bound - 1, hi - lo)
+    while known < top:
+        mid = (known + top + 1) // 2
+        if goes_last(seq[hi - mid]):
+            known = mid
+        else:
+            top = mid - 1
+    return known
+
+
+def _gallop_steps(at, size, goes_first, probe):
+    """_gallop over the elements at(0), ..., at(size - 1), yielding the COMPARE
+    step probe(p) for every probed offset p; returns the prefix length"""
+    known = 0
+    bound = 1
+    while bound <= size:
+        yield probe(bound - 1)
+        if not goes_first(at(bound - 1)):
+            break
+        known = bound
+        bound = 2 * bound + 1
+    top = min(bound - 1, size)
+    while known < top:
+        mid = (known + top + 1) // 2
+        yield probe(mid - 1)
+        if goes_first(at(mid - 1)):
+            known = mid
+        else:
+            top = mid - 1
+    return known
+
+
+def _merge_lo_steps(seq, aux, lo, mid, hi, before):
+    """Merge the sorted runs seq[lo:mid] and seq[mid:hi] front to back,
+    buffering the left run in aux and galloping through long one-sided
+    streaks; yields the steps"""
+    m = mid - lo
+    for t in range(m):
+        aux[t] = seq[lo + t]
+    i, j, k = 0, mid, lo
+    left_wins = right_wins = 0
+
+    while i < m and j < hi:
+        yield COMPARE, k, j
+        if before(seq[j], aux[i]):
+            seq[k] = seq[j]
+            yield WRITE, k, seq[k]
+            j += 1
+            k += 1
+            right_wins += 1
+            left_wins = 0
+            if right_wins >= MIN_GALLOP and j < hi:
+                key = aux[i]
+                count = yield from _gallop_steps(lambda p: seq[j + p], hi - j, lambda x: before(x, key),
+                                                 lambda p: (COMPARE, k, j + p))
+                for _ in range(count):
+                    seq[k] = seq[j]
+                    yield WRITE, k, seq[k]
+                    j += 1
+                    k += 1
+                right_wins = 0
+        else:
+            seq[k] = aux[i]
+            yield WRITE, k, aux[i]
+            i += 1
+            k += 1
+            left_wins += 1
+            right_wins = 0
+            if left_wins >= MIN_GALLOP and i < m:
+                key = seq[j]
+                count = yield from _gallop_steps(lambda p: aux[i + p], m - i, lambda x: not before(key, x),
+                                                 lambda p: (COMPARE, k + p, j))
+                for _ in range(count):
+                    seq[k] = aux[i]
+                    yield WRITE, k, aux[i]
+                    i += 1
+                    k += 1
+                left_wins = 0
+
+    # Whatever is left of the right run is already in place
+    while i < m:
+        seq[k] = aux[i]
+        yield WRITE, k, aux[i]
+        i += 1
+        k += 1
 
 
 def merge_sort(arr, ascending=True):
-    local_arr = list(arr)
-
-    def _merge_sort_recursive(sub_arr, start, end):
-        if start < end:
-            mid = (start + end) // 2
-            yield from _merge_sort_recursive(sub_arr, start, mid)
-            yield from _merge_sort_recursive(sub_arr, mid + 1, end)
-
-            left_half = sub_arr[start:mid + 1]
-            right_half = sub_arr[mid + 1:end + 1]
-            i = j = 0
-            k = start
-
-            while i < len(left_half) and j < len(right_half):
-                yield sub_arr, {start + i: RED, mid + 1 + j: RED} 
-                if (left_half[i] <= right_half[j] and ascending) or \
-                   (left_half[i] > right_half[j] and not ascending):
-                    sub_arr[k] = left_half[i]
+    """Bottom-up merge sort. Each merge copies only its left run into one
+    preallocated buffer and merges back into the array, skips runs that are
+    already in order and gallops through long one-sided streaks."""
+    local_arr = working_copy(arr)
+    n = len(local_arr)
+    # Left runs are at most the largest power of two below n long
+    aux = zeros_like(local_arr, 1 << (n - 1).bit_length() - 1 if n > 1 else 0)
+    before = operator.lt if ascending else operator.gt
+
+    width = 1
+    while width < n:
+        for lo in range(0, n - width, 2 * width):
+            mid = lo + width
+            hi = min(mid + width, n)
+            yield COMPARE, mid - 1, mid
+            if before(local_arr[mid], local_arr[mid - 1]):
+                yield from _merge_lo_steps(local_arr, aux, lo, mid, hi, before)
+        width *= 2
+
+    return local_arr
+
+
+def _merge_hi_steps(seq, aux, lo, mid, hi, before):
+    """_merge_lo_steps mirrored: buffers the right run and merges back to
+    front, for when the right run is the shorter one"""
+    m = hi - mid
+    for t in range(m):
+        aux[t] = seq[mid + t]
+    i, j, k = mid - 1, m - 1, hi - 1
+    left_wins = right_wins = 0
+
+    while i >= lo and j >= 0:
+        yield COMPARE, i, k
+        if before(aux[j], seq[i]):
+            seq[k] = seq[i]
+            yield WRITE, k, seq[k]
+            i -= 1
+            k -= 1
+            left_wins += 1
+            right_wins = 0
+            if left_wins >= MIN_GALLOP and i >= lo:
+                key = aux[j]
+                count = yield from _gallop_steps(lambda p: seq[i - p], i - lo + 1, lambda x: before(key, x),
+                                                 lambda p: (COMPARE, i - p, k))
+                for _ in range(count):
+                    seq[k] = seq[i]
+                    yield WRITE, k, seq[k]
+                    i -= 1
+                    k -= 1
+                left_wins = 0
+        else:
+            seq[k] = aux[j]
+            yield WRITE, k, aux[j]
+            j -= 1
+            k -= 1
+            right_wins += 1
+            left_wins = 0
+            if right_wins >= MIN_GALLOP and j >= 0:
+                key = seq[i]
+                count = yield from _gallop_steps(lambda p: aux[j - p], j + 1, lambda x: not before(x, key),
+                                                 lambda p: (COMPARE, i, k - p))
+                for _ in range(count):
+                    seq[k] = aux[j]
+                    yield WRITE, k, aux[j]
+                    j -= 1
+                    k -= 1
+                right_wins = 0
+
+    # Whatever is left of the left run is already in place
+    while j >= 0:
+        seq[k] = aux[j]
+        yield WRITE, k, aux[j]
+        j -= 1
+        k -= 1
+
+
+# Timsort: runs shorter than the minimum run length are extended with binary
+# insertion sort; arrays shorter than TIM_MIN_MERGE are one such run
+TIM_MIN_MERGE = 64
+
+
+def _min_run(n):
+    """A run length in [TIM_MIN_MERGE / 2, TIM_MIN_MERGE] that splits n into
+    a power of two or slightly fewer runs"""
+    extra = 0
+    while n >= TIM_MIN_MERGE:
+        extra |= n & 1
+        n >>= 1
+    return n + extra
+
+
+def _tim_merge_index(runs, force=False):
+    """Index of the next pair of [start, length] runs to merge, or None once
+    every run is longer than the next two combined and than the next one.
+    The lengths then grow at least as fast as the Fibonacci numbers, so the
+    stack holds O(log n) runs. With force, merge down to a single run."""
+    if len(runs) < 2:
+        return None
+    i = len(runs) - 2
+    if (force or (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1])
+            or (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1])):
+        if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+            i -= 1
+        return i
+    if runs[i][1] <= runs[i + 1][1]:
+        return i
+    return None
+
+
+def tim_sort(arr, ascending=True):
+    """Timsort. Finds the natural runs (strictly descending ones are reversed
+    in place), extends short runs to the minimum run length with binary
+    insertion, and merges them off a stack whose lengths keep the Timsort
+    invariants. Each merge first gallops past the elements that are already
+    in place, then buffers the shorter run, so sorted or appended-to input
+    costs close to n comparisons."""
+    local_arr = working_copy(arr)
+    n = len(local_arr)
+    aux = zeros_like(local_arr, n // 2)
+    before = operator.lt if ascending else operator.gt
+    min_run = _min_run(n)
+    runs = []
+
+    def merge_at(i):
+        base_a, len_a = runs[i]
+        base_b, len_b = runs[i + 1]
+        runs[i][1] = len_a + len_b
+        del runs[i + 1]
+
+        # Left elements that do not go after the right run's first are in place
+        key = local_arr[base_b]
+        skip = yield from _gallop_steps(lambda p: local_arr[base_a + p], len_a, lambda x: not before(key, x),
+                                        lambda p: (COMPARE, base_a + p, base_b))
+        base_a += skip
+        len_a -= skip
+        if len_a == 0:
+            return
+        # ...and so are right elements that do not go before the left run's last
+        key = local_arr[base_b - 1]
+        len_b = yield from _gallop_steps(lambda p: local_arr[base_b + p], len_b, lambda x: before(x, key),
+                                         lambda p: (COMPARE, base_b - 1, base_b + p))
+        if len_a <= len_b:
+            yield from _merge_lo_steps(local_arr, aux, base_a, base_b, base_b + len_b, before)
+        else:
+            yield from _merge_hi_steps(local_arr, aux, base_a, base_b, base_b + len_b, before)
+
+    lo = 0
+    while lo < n:
+        # Natural run
+        run_hi = lo + 1
+        if run_hi < n:
+            yield COMPARE, lo, run_hi
+            if before(local_arr[run_hi], local_arr[lo]):
+                run_hi += 1
+                while run_hi < n:
+                    yield COMPARE, run_hi - 1, run_hi
+                    if not before(local_arr[run_hi], local_arr[run_hi - 1]):
+                        break
+                    run_hi += 1
+                i, j = lo, run_hi - 1
+                while i < j:
+                    local_arr[i], local_arr[j] = local_arr[j], local_arr[i]
+                    yield SWAP, i, j
                     i += 1
+                    j -= 1
+            else:
+                run_hi += 1
+                while run_hi < n:
+                    yield COMPARE, run_hi - 1, run_hi
+                    if before(local_arr[run_hi], local_arr[run_hi - 1]):
+                        break
+                    run_hi += 1
+
+        # Extend a short run with binary insertion
+        end = min(lo + min_run, n)
+        for i in range(run_hi, end):
+            pivot = local_arr[i]
+            left, right = lo, i
+            while left < right:
+                mid = (left + right) // 2
+                yield COMPARE, i, mid
+                if before(pivot, local_arr[mid]):
+                    right = mid
                 else:
-                    sub_arr[k] = right_half[j]
-                    j += 1
-                k += 1
-                yield sub_arr, {k-1: GREEN}
-            
-            while i < len(left_half):
-                sub_arr[k] = left_half[i]
-                i += 1
-                k += 1
-                yield sub_arr, {k-1: GREEN}
+                    left = mid + 1
+            for t in range(i, left, -1):
+                local_arr[t] = local_arr[t - 1]
+                yield WRITE, t, local_arr[t]
+            if left != i:
+                local_arr[left] = pivot
+                yield WRITE, left, pivot
+        run_hi = max(run_hi, end)
 
-            while j < len(right_half):
-                sub_arr[k] = right_half[j]
-                j += 1
-                k += 1
-                yield sub_arr, {k-1: GREEN}
-    
-    yield from _merge_sort_recursive(local_arr, 0, len(local_arr) - 1)
-    yield local_arr, {} 
+        runs.append([lo, run_hi - lo])
+        i = _tim_merge_index(runs)
+        while i is not None:
+            yield from merge_at(i)
+            i = _tim_merge_index(runs)
+        lo = run_hi
+
+    i = _tim_merge_index(runs, force=True)
+    while i is not None:
+        yield from merge_at(i)
+        i = _tim_merge_index(runs, force=True)
+
+    return local_arr
 
 
 def quick_sort(arr, ascending=True, low=0, high=None):
-    local_arr = list(arr)
+    local_arr = working_copy(arr)
 
     if high is None:
         high = len(local_arr) - 1
@@ -101,88 +387,252 @@ def quick_sort(arr, ascending=True, low=0, high=None):
             pivot = local_arr[pivot_index]
             i = low - 1
 
-            yield local_arr, {pivot_index: GREEN}
+            yield MARK, pivot_index, GREEN
 
             for j in range(low, high):
-                yield local_arr, {j: RED, pivot_index: GREEN}
+                yield COMPARE, j, pivot_index
                 if (local_arr[j] <= pivot and ascending) or \
                    (local_arr[j] > pivot and not ascending):
                     i += 1
                     local_arr[i], local_arr[j] = local_arr[j], local_arr[i]
-                    yield local_arr, {i: GREEN, j: GREEN, pivot_index: GREEN} 
+                    yield SWAP, i, j
             
             local_arr[i + 1], local_arr[high] = local_arr[high], local_arr[i + 1]
             pi = i + 1
-            yield local_arr, {pi: GREEN, high: GREEN}
+            yield SWAP, pi, high
 
             stack.append((low, pi - 1))
             stack.append((pi + 1, high))
     
-    yield local_arr, {} 
+    return local_arr
+
+# Introsort tuning: partitions this small are finished with insertion sort,
+# and partitions larger than NINTHER_THRESHOLD pick their pivot as the
+# median of three medians-of-three instead of a single median-of-three.
+INTRO_INSERTION_THRESHOLD = 16
+NINTHER_THRESHOLD = 128
+
+
+def _intro_depth_limit(n):
+    return 2 * max(n, 1).bit_length()
+
+
+def intro_sort(arr, ascending=True):
+    """Quick sort that stays O(n log n): ninther / median-of-three pivots,
+    3-way partitioning so runs of equal keys are placed at once, the larger
+    side deferred on the stack (O(log n) entries), heap sort past the depth
+    limit and insertion sort for small partitions"""
+    local_arr = working_copy(arr)
+
+    def before(x, y):
+        return x < y if ascending else x > y
+
+    def median_of_three(a, b, c):
+        yield COMPARE, a, b
+        if before(local_arr[b], local_arr[a]):
+            a, b = b, a
+        yield COMPARE, b, c
+        if not before(local_arr[c], local_arr[b]):
+            return b
+        yield COMPARE, a, c
+        return c if before(local_arr[a], local_arr[c]) else a
+
+    def choose_pivot(lo, hi):
+        mid = (lo + hi) // 2
+        if hi - lo > NINTHER_THRESHOLD:
+            step = (hi - lo) // 8
+            m1 = yield from median_of_three(lo, lo + step, lo + 2 * step)
+            m2 = yield from median_of_three(mid - step, mid, mid + step)
+            m3 = yield from median_of_three(hi - 1 - 2 * step, hi - 1 - step, hi - 1)
+            return (yield from median_of_three(m1, m2, m3))
+        return (yield from median_of_three(lo, mid, hi - 1))
+
+    def insertion(lo, hi):
+        for i in range(lo + 1, hi):
+            j = i
+            while j > lo:
+                yield COMPARE, j - 1, j
+                if not before(local_arr[j], local_arr[j - 1]):
+                    break
+                local_arr[j - 1], local_arr[j] = local_arr[j], local_arr[j - 1]
+                yield SWAP, j - 1, j
+                j -= 1
+
+    def sift_down(lo, root, size):
+        while True:
+            child = 2 * root + 1
+            if child >= size:
+                return
+            if child + 1 < size:
+                yield COMPARE, lo + child, lo + child + 1
+                if before(local_arr[lo + child], local_arr[lo + child + 1]):
+                    child += 1
+            yield COMPARE, lo + root, lo + child
+            if not before(local_arr[lo + root], local_arr[lo + child]):
+                return
+            local_arr[lo + root], local_arr[lo + child] = local_arr[lo + child], local_arr[lo + root]
+            yield SWAP, lo + root, lo + child
+            root = child
+
+    def heap(lo, hi):
+        size = hi - lo
+        for root in range(size // 2 - 1, -1, -1):
+            yield from sift_down(lo, root, size)
+        for end in range(size - 1, 0, -1):
+            local_arr[lo], local_arr[lo + end] = local_arr[lo + end], local_arr[lo]
+            yield SWAP, lo, lo + end
+            yield from sift_down(lo, 0, end)
+
+    stack = [(0, len(local_arr), _intro_depth_limit(len(local_arr)))]
+    while stack:
+        lo, hi, depth = stack.pop()
+        while hi - lo > INTRO_INSERTION_THRESHOLD:
+            if depth == 0:
+                yield RANGE, lo, hi, PURPLE
+                yield from heap(lo, hi)
+                break
+            depth -= 1
+
+            # Dutch national flag: [lo, lt) before the pivot, [lt, i) equal,
+            # (gt, hi) after it; the pivot sits at lt throughout
+            p = yield from choose_pivot(lo, hi)
+            local_arr[lo], local_arr[p] = local_arr[p], local_arr[lo]
+            yield SWAP, lo, p
+            pivot = local_arr[lo]
+            yield MARK, lo, GREEN
+            lt, i, gt = lo, lo + 1, hi - 1
+            while i <= gt:
+                yield COMPARE, i, lt
+                value = local_arr[i]
+                if before(value, pivot):
+                    local_arr[lt], local_arr[i] = value, local_arr[lt]
+                    yield SWAP, lt, i
+                    lt += 1
+                    i += 1
+                elif before(pivot, value):
+                    local_arr[i], local_arr[gt] = local_arr[gt], value
+                    yield SWAP, i, gt
+                    gt -= 1
+                else:
+                    i += 1
+
+            # Defer the larger side and keep going with the smaller one
+            if lt - lo < hi - gt - 1:
+                stack.append((gt + 1, hi, depth))
+                hi = lt
+            else:
+                stack.append((lo, lt, depth))
+                lo = gt + 1
+        else:
+            yield from insertion(lo, hi)
+
+    return local_arr
+
 
-def heap_sort(arr, ascending=True):
-    local_arr = list(arr)
+def heap_sort(arr, ascending=True, floyd=False):
+    """Heap sort as one flat loop, so every step is yielded straight from this
+    generator. With floyd=True each extraction first walks the new root down
+    to a leaf along the larger children (one compare per level) and then
+    sifts it back up, which takes about half the comparisons."""
+    local_arr = working_copy(arr)
     n = len(local_arr)
+    before = operator.lt if ascending else operator.gt
 
-    def heapify(arr_ref, n_ref, i_ref):
-        root_idx = i_ref
-        left = 2 * i_ref + 1
-        right = 2 * i_ref + 2
-
-        highlights = {root_idx: GREEN}
-        if left < n_ref: highlights[left] = RED
-        if right < n_ref: highlights[right] = RED
-        yield arr_ref, highlights
-
-        if ascending:
-            if left < n_ref and arr_ref[root_idx] < arr_ref[left]:
-                root_idx = left
-            if right < n_ref and arr_ref[root_idx] < arr_ref[right]:
-                root_idx = right
+    start = n // 2
+    end = n
+    while True:
+        if start > 0:
+            start -= 1  # Still building the heap
         else:
-            if left < n_ref and arr_ref[root_idx] > arr_ref[left]:
-                root_idx = left
-            if right < n_ref and arr_ref[root_idx] > arr_ref[right]:
-                root_idx = right
-        
-        if root_idx != i_ref:
-            arr_ref[i_ref], arr_ref[root_idx] = arr_ref[root_idx], arr_ref[i_ref]
-            yield arr_ref, {i_ref: GREEN, root_idx: GREEN}
-            yield from heapify(arr_ref, n_ref, root_idx)
+            end -= 1
+            if end <= 0:
+                break
+            local_arr[0], local_arr[end] = local_arr[end], local_arr[0]
+            yield SWAP, 0, end
 
-    for i in range(n // 2 - 1, -1, -1):
-        yield from heapify(local_arr, n, i)
+            if floyd:
+                pos = 0
+                child = 1
+                while child < end:
+                    if child + 1 < end:
+                        yield COMPARE, child, child + 1
+                        if before(local_arr[child], local_arr[child + 1]):
+                            child += 1
+                    local_arr[pos], local_arr[child] = local_arr[child], local_arr[pos]
+                    yield SWAP, pos, child
+                    pos = child
+                    child = 2 * pos + 1
+                while pos > 0:
+                    parent = (pos - 1) // 2
+                    yield COMPARE, parent, pos
+                    if not before(local_arr[parent], local_arr[pos]):
+                        break
+                    local_arr[parent], local_arr[pos] = local_arr[pos], local_arr[parent]
+                    yield SWAP, parent, pos
+                    pos = parent
+                continue
 
-    for i in range(n - 1, 0, -1):
-        yield local_arr, {i: GREEN, 0: RED} 
-        local_arr[i], local_arr[0] = local_arr[0], local_arr[i]
-        yield local_arr, {i: GREEN, 0: GREEN}
-        yield from heapify(local_arr, i, 0)
-    
-    yield local_arr, {} 
+        # Sift local_arr[start] down within the heap local_arr[:end]
+        i = start
+        while True:
+            root_idx = i
+            left = 2 * i + 1
+            right = left + 1
+            if left < end:
+                yield COMPARE, root_idx, left
+                if before(local_arr[root_idx], local_arr[left]):
+                    root_idx = left
+            if right < end:
+                yield COMPARE, root_idx, right
+                if before(local_arr[root_idx], local_arr[right]):
+                    root_idx = right
+            if root_idx == i:
+                break
+            local_arr[i], local_arr[root_idx] = local_arr[root_idx], local_arr[i]
+            yield SWAP, i, root_idx
+            i = root_idx
 
-def _counting_sort_by_digit(a: List[int], exp: int, base: int = 10) -> None:
+    return local_arr
+
+
+def floyd_heap_sort(arr, ascending=True):
+    return heap_sort(arr, ascending, floyd=True)
+
+# Default radix: byte-wise digits, so 32-bit keys take 4 passes instead of 10
+RADIX_BASE = 256
+
+
+def _digits(a: List[int], exp: int, base: int) -> List[int]:
+    """The digit of every element at place value exp. Power-of-two bases use
+    a shift and a mask instead of division."""
+    if base & (base - 1) == 0:
+        shift = exp.bit_length() - 1
+        mask = base - 1
+        return [(x >> shift) & mask for x in a]
+    return [(x // exp) % base for x in a]
+
+
+def _counting_sort_by_digit(a: List[int], exp: int, base: int = RADIX_BASE) -> None:
     n = len(a)
-    output = [0] * n
+    output = zeros_like(a, n)
     count = [0] * base
+    digits = _digits(a, exp, base)
 
-    for i in range(n):
-        digit = (a[i] // exp) % base
+    for digit in digits:
         count[digit] += 1
 
     for d in range(1, base):
         count[d] += count[d - 1]
 
     for i in range(n - 1, -1, -1):
-        digit = (a[i] // exp) % base
+        digit = digits[i]
         pos = count[digit] - 1
         output[pos] = a[i]
         count[digit] -= 1
 
-    for i in range(n):
-        a[i] = output[i]
+    a[:] = output
 
-def radix_sort_lsd_nonneg(a: List[int], base: int = 10) -> List[int]:
+def radix_sort_lsd_nonneg(a: List[int], base: int = RADIX_BASE) -> List[int]:
     if not a:
         return a
     max_val = max(a)
@@ -192,9 +642,10 @@ def radix_sort_lsd_nonneg(a: List[int], base: int = 10) -> List[int]:
         exp *= base
     return a
 
-def radix_sort_lsd(a: List[int], base: int = 10) -> List[int]:
+def radix_sort_lsd(a: List[int], base: int = RADIX_BASE) -> List[int]:
     if not a:
         return a
+    # Lists, since -min can pass the int64 range of array('q')
     neg = [-x for x in a if x < 0]
     pos = [x for x in a if x >= 0]
 
@@ -202,112 +653,319 @@ def radix_sort_lsd(a: List[int], base: int = 10) -> List[int]:
         radix_sort_lsd_nonneg(neg, base)
     if pos:
         radix_sort_lsd_nonneg(pos, base)
-    neg_sorted = [-x for x in reversed(neg)]
-    out = neg_sorted + pos
-    return out
+    return like(a, [-x for x in reversed(neg)] + pos)
 
-def radix_sort(arr, ascending=True):
+def _counting_sort_by_digit_np(a: np.ndarray, exp: int, base: int = 256) -> np.ndarray:
+    """One stable LSD pass over unsigned keys, vectorized"""
+    if base & (base - 1) == 0:
+        digits = (a >> np.uint64(exp.bit_length() - 1)) & np.uint64(base - 1)
+    else:
+        digits = (a // np.uint64(exp)) % np.uint64(base)
+    # NumPy's stable argsort is a linear-time radix sort for 8/16-bit keys
+    if base <= 1 << 8:
+        digits = digits.astype(np.uint8)
+    elif base <= 1 << 16:
+        digits = digits.astype(np.uint16)
+    return a[np.argsort(digits, kind='stable')]
+
+def radix_sort_lsd_np(a, base: int = 256) -> np.ndarray:
+    """LSD radix sort on an int64 ndarray. Negatives are handled by shifting the
+    keys by the minimum in unsigned space, so no sign split is needed."""
+    a = np.asarray(a, dtype=np.int64)
+    if a.size == 0:
+        return a.copy()
+    min_val = a.min()
+    keys = (a - min_val).view(np.uint64)  # wraps for ranges past 2**63, still exact
+    max_key = int(keys.max())
+    exp = 1
+    while max_key // exp > 0:
+        keys = _counting_sort_by_digit_np(keys, exp, base)
+        exp *= base
+    return keys.view(np.int64) + min_val
+
+def radix_sort_np(arr, ascending=True) -> np.ndarray:
+    out = radix_sort_lsd_np(arr)
+    return out if ascending else out[::-1]
 
-    local_arr = list(arr)
+def counting_sort_np(arr, ascending=True, info=None) -> np.ndarray:
+    a = np.asarray(arr, dtype=np.int64)
+    if a.size == 0:
+        return a.copy()
+    min_val = a.min()
+    max_val = a.max()
+    strategy = counting_strategy(a.size, int(min_val), int(max_val))
+    if info is not None:
+        info.update(strategy=strategy, k=int(max_val - min_val) + 1)
+    if strategy == 'dense':
+        counts = np.bincount(a - min_val)
+        keys = np.arange(min_val, min_val + len(counts), dtype=np.int64)
+    else:
+        # Sort-based histogram: only the distinct keys get a count
+        keys, counts = np.unique(a, return_counts=True)
+        if info is not None:
+            info['distinct'] = len(keys)
+    out = np.repeat(keys, counts)
+    return out if ascending else out[::-1]
+
+def radix_sort(arr, ascending=True, base=RADIX_BASE):
+
+    local_arr = working_copy(arr)
     
     if not local_arr:
-        yield local_arr, {}
-        return
+        return local_arr
     
     if any(x < 0 for x in local_arr):
-        min_val = min(local_arr)
-        offset = -min_val if min_val < 0 else 0
-        
-        for i in range(len(local_arr)):
-            local_arr[i] += offset
-            yield local_arr, {i: RED}
+        offset = -min(local_arr)
+        # Shifted keys reach max - min, which can pass the int64 range of array('q')
+        shifted = local_arr if max(local_arr) + offset < 1 << 63 else list(local_arr)
 
-        yield from _radix_sort_with_visualization(local_arr, ascending)
+        for i in range(len(shifted)):
+            shifted[i] += offset
+            yield WRITE, i, shifted[i]
+
+        yield from _radix_sort_with_visualization(shifted, ascending, base)
         
-        for i in range(len(local_arr)):
-            local_arr[i] -= offset
-            yield local_arr, {i: GREEN}
+        for i in range(len(shifted)):
+            local_arr[i] = shifted[i] - offset
+            yield WRITE, i, local_arr[i]
     else:
-        yield from _radix_sort_with_visualization(local_arr, ascending)
+        yield from _radix_sort_with_visualization(local_arr, ascending, base)
     
-    yield local_arr, {}
+    return local_arr
 
-def _radix_sort_with_visualization(local_arr, ascending=True):
+def _radix_sort_with_visualization(local_arr, ascending=True, base=RADIX_BASE):
     max_val = max(local_arr)
     exp = 1
+    n = len(local_arr)
     
     while max_val // exp > 0:
-        yield local_arr, {i: YELLOW for i in range(len(local_arr))}
+        yield RANGE, 0, n, YELLOW
         
-        n = len(local_arr)
-        output = [0] * n
-        count = [0] * 10
+        output = zeros_like(local_arr, n)
+        count = [0] * base
+        digits = _digits(local_arr, exp, base)
 
         for i in range(n):
-            digit = (local_arr[i] // exp) % 10
-            count[digit] += 1
-            yield local_arr, {i: RED}
+            count[digits[i]] += 1
+            yield MARK, i, RED
 
-        for d in range(1, 10):
+        for d in range(1, base):
             count[d] += count[d - 1]
 
         for i in range(n - 1, -1, -1):
-            digit = (local_arr[i] // exp) % 10
+            digit = digits[i]
             pos = count[digit] - 1
             output[pos] = local_arr[i]
             count[digit] -= 1
-            yield local_arr, {i: GREEN}
+            yield MARK, i, GREEN
         
         for i in range(n):
             local_arr[i] = output[i]
-            yield local_arr, {i: BLUE}
+            yield WRITE, i, output[i]
         
-        exp *= 10
+        exp *= base
 
     if not ascending:
-        local_arr.reverse()
-        yield local_arr, {i: PURPLE for i in range(len(local_arr))}
+        yield RANGE, 0, n, PURPLE
+        for i in range(n // 2):
+            local_arr[i], local_arr[n - 1 - i] = local_arr[n - 1 - i], local_arr[i]
+            yield SWAP, i, n - 1 - i
 
-def bucket_sort(arr, ascending=True):
-    """Bucket Sort with visualization support"""
-    local_arr = list(arr)
+# MSD radix sort: buckets this small are finished with insertion sort
+MSD_INSERTION_THRESHOLD = 16
+
+
+def _msd_plan(a, base):
+    """Digit width in bits and the shift of the most significant digit for
+    keys x - min(a)"""
+    if base & (base - 1) != 0:
+        raise ValueError("MSD radix sort needs a power-of-two base")
+    bits = base.bit_length() - 1
+    top = max(a) - min(a)
+    shift = max(top.bit_length() - 1, 0) // bits * bits
+    return bits, shift
+
+
+def msd_radix_sort(arr, ascending=True, base=RADIX_BASE):
+    """Most-significant-digit radix sort on the keys x - min, with
+    shift/mask digits. A bucket whose elements all share the current digit
+    goes straight to the next digit without moving anything, buckets of one
+    element are done, and buckets of MSD_INSERTION_THRESHOLD or fewer are
+    insertion-sorted, so wide keys with short common prefixes need few
+    passes."""
+    local_arr = working_copy(arr)
     n = len(local_arr)
-    
-    if n == 0:
-        yield local_arr, {}
-        return
+    if n < 2:
+        return local_arr
 
     min_val = min(local_arr)
-    max_val = max(local_arr)
-    
-    if min_val == max_val:
-        yield local_arr, {}
-        return
+    bits, top_shift = _msd_plan(local_arr, base)
+    mask = base - 1
+    before = operator.lt if ascending else operator.gt
+    order = range(base) if ascending else range(base - 1, -1, -1)
 
-    num_buckets = n
-    buckets = [[] for _ in range(num_buckets)]
+    stack = [(0, n, top_shift)]
+    while stack:
+        lo, hi, shift = stack.pop()
+        yield RANGE, lo, hi, YELLOW
 
-    for i, val in enumerate(local_arr):
-        normalized = (val - min_val) / (max_val - min_val)
-        bucket_index = min(int(normalized * num_buckets), num_buckets - 1)
-        buckets[bucket_index].append(val)
-        
-        yield local_arr, {i: RED}
-
-    result = []
-    for bucket in buckets:
-        if bucket:
-            bucket.sort()
-            result.extend(bucket)
-            yield result + local_arr[len(result):], {}
-    if not ascending:
-        result.reverse()
+        if hi - lo <= MSD_INSERTION_THRESHOLD:
+            for i in range(lo + 1, hi):
+                key = local_arr[i]
+                j = i - 1
+                while j >= lo:
+                    yield COMPARE, j, j + 1
+                    if not before(key, local_arr[j]):
+                        break
+                    local_arr[j + 1] = local_arr[j]
+                    yield WRITE, j + 1, local_arr[j]
+                    j -= 1
+                if j + 1 != i:
+                    local_arr[j + 1] = key
+                    yield WRITE, j + 1, key
+            continue
 
-    for i in range(len(result)):
-        local_arr[i] = result[i]
-        yield local_arr, {i: GREEN}
-    
-    yield local_arr, {}
+        segment = local_arr[lo:hi]
+        digits = [((x - min_val) >> shift) & mask for x in segment]
+        count = [0] * base
+        for i, digit in enumerate(digits):
+            count[digit] += 1
+            yield MARK, lo + i, RED
+
+        if max(count) == hi - lo:
+            # Every element shares this digit: nothing to move
+            if shift:
+                stack.append((lo, hi, shift - bits))
+            continue
+
+        starts = [0] * base
+        pos = lo
+        for digit in order:
+            starts[digit] = pos
+            pos += count[digit]
+        for x, digit in zip(segment, digits):
+            pos = starts[digit]
+            starts[digit] = pos + 1
+            local_arr[pos] = x
+            yield WRITE, pos, x
+
+        if shift:
+            for digit in order:
+                if count[digit] > 1:
+                    end = starts[digit]
+                    stack.append((end - count[digit], end, shift - bits))
+
+    return local_arr
+
+
+# Bucket sort tuning. Buckets hold about BUCKET_TARGET_SIZE elements; the
+# skew check looks at up to BUCKET_SAMPLE evenly strided elements spread over
+# BUCKET_SKEW_CELLS coarse cells, and switches to sample-quantile splitters
+# when one cell holds more than BUCKET_SKEW_FACTOR times its share.
+BUCKET_TARGET_SIZE = 4
+BUCKET_SAMPLE = 1024
+BUCKET_SKEW_CELLS = 16
+BUCKET_SKEW_FACTOR = 4
+BUCKET_INSERTION_LIMIT = 32
+
+
+def _bucket_indices(a):
+    """Assign every element of a (int or float ndarray) to a bucket.
+
+    Returns (indices, bucket_count), or None when all elements are equal.
+    Integer data whose range is smaller than n gets one bucket per value;
+    otherwise the range is split linearly into ~n / BUCKET_TARGET_SIZE buckets,
+    or at sample quantiles when a sample shows the data is skewed.
+    """
+    n = len(a)
+    lo, hi = a.min(), a.max()
+    if lo == hi:
+        return None
+    if a.dtype.kind in 'iu':
+        # hi - lo can pass the int64 range; as uint64 the offsets wrap to the exact value
+        def offsets(x):
+            return x.astype(np.uint64) - np.uint64(lo)
+        if int(hi) - int(lo) < n:
+            return offsets(a).astype(np.intp), int(hi) - int(lo) + 1
+    else:
+        def offsets(x):
+            return x - lo
+
+    span = float(int(hi) - int(lo)) if a.dtype.kind in 'iu' else float(hi) - float(lo)
+    sample = a[::max(n // BUCKET_SAMPLE, 1)]
+    cells = np.minimum((offsets(sample) * (BUCKET_SKEW_CELLS / span)).astype(np.intp), BUCKET_SKEW_CELLS - 1)
+    loads = np.bincount(cells, minlength=BUCKET_SKEW_CELLS)
+    if loads.max() > BUCKET_SKEW_FACTOR * len(sample) / BUCKET_SKEW_CELLS:
+        count = max(min(n // BUCKET_TARGET_SIZE, len(sample) // 2), 1)
+        splitters = np.unique(np.quantile(sample, np.linspace(0, 1, count + 1)[1:-1]))
+        return np.searchsorted(splitters, a, side='right'), len(splitters) + 1
+
+    count = max(n // BUCKET_TARGET_SIZE, 1)
+    return np.minimum((offsets(a) * (count / span)).astype(np.intp), count - 1), count
+
+
+def _bucket_groups(values):
+    """values regrouped by bucket (stable), plus each bucket's start and size"""
+    plan = _bucket_indices(np.asarray(values))
+    if plan is None:
+        return None
+    indices, count = plan
+    order = np.argsort(indices, kind='stable').tolist()
+    sizes = np.bincount(indices, minlength=count)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    return [values[i] for i in order], starts.tolist(), sizes.tolist()
+
+
+def bucket_sort(arr, ascending=True):
+    """Bucket sort with a data-dependent bucket count (see _bucket_indices).
+    Buckets are written back into the array in order, then small ones are
+    insertion-sorted in place; large ones are sorted before they are written.
+    Works on int and float keys."""
+    local_arr = working_copy(arr)
+    n = len(local_arr)
+
+    if n < 2:
+        return local_arr
+
+    for i in range(n):
+        yield MARK, i, RED
+
+    groups = _bucket_groups(local_arr)
+    if groups is None:
+        return local_arr
+    grouped, starts, sizes = groups
+    before = operator.lt if ascending else operator.gt
+
+    k = 0
+    for b in (range(len(sizes)) if ascending else range(len(sizes) - 1, -1, -1)):
+        size = sizes[b]
+        if not size:
+            continue
+        bucket = grouped[starts[b]:starts[b] + size]
+        if size > BUCKET_INSERTION_LIMIT:
+            bucket.sort(reverse=not ascending)
+        for val in bucket:
+            local_arr[k] = val
+            yield WRITE, k, val
+            k += 1
+
+        if 1 < size <= BUCKET_INSERTION_LIMIT:
+            lo = k - size
+            for i in range(lo + 1, k):
+                key = local_arr[i]
+                j = i - 1
+                while j >= lo:
+                    yield COMPARE, j, j + 1
+                    if not before(key, local_arr[j]):
+                        break
+                    local_arr[j + 1] = local_arr[j]
+                    yield WRITE, j + 1, local_arr[j]
+                    j -= 1
+                if j + 1 != i:
+                    local_arr[j + 1] = key
+                    yield WRITE, j + 1, key
+
+    return local_arr
 
 def partition(arr: List[int], low: int, high: int) -> int:
     pivot = arr[high]
@@ -321,14 +979,14 @@ def partition(arr: List[int], low: int, high: int) -> int:
 
 
 def selection_sort(arr, ascending=True):
-    local_arr = list(arr)
+    local_arr = working_copy(arr)
     n = len(local_arr)
     
     for i in range(n):
         min_idx = i
 
         for j in range(i + 1, n):
-            yield local_arr, {i: RED, j: RED, min_idx: GREEN}
+            yield COMPARE, j, min_idx
             
             if (local_arr[j] < local_arr[min_idx] and ascending) or \
                (local_arr[j] > local_arr[min_idx] and not ascending):
@@ -336,40 +994,610 @@ def selection_sort(arr, ascending=True):
 
         if min_idx != i:
             local_arr[i], local_arr[min_idx] = local_arr[min_idx], local_arr[i]
-            yield local_arr, {i: GREEN, min_idx: GREEN}
+            yield SWAP, i, min_idx
     
-    yield local_arr, {}
+    return local_arr
+
+# Counting sort switches from a dense count array to a dict histogram over
+# the distinct keys when the value range k exceeds this many times n
+COUNTING_SPARSE_RATIO = 8
 
-def counting_sort(arr, ascending=True):
-    local_arr = list(arr)
+
+def counting_strategy(n, min_val, max_val):
+    """'dense' when a count array over [min_val, max_val] is affordable for n
+    elements, 'sparse' when the range is much wider than the data"""
+    return 'sparse' if max_val - min_val + 1 > COUNTING_SPARSE_RATIO * n + 256 else 'dense'
+
+
+def _counting_starts(values, ascending, info=None):
+    """Histogram values and turn it into each key's first output position.
+
+    Returns (starts, offset): output position of the next element equal to v
+    is starts[v - offset]. Dense ranges use a list of prefix sums; sparse
+    ranges a dict over the sorted distinct keys. The strategy and range are
+    written into info when it is given.
+    """
+    min_val = min(values)
+    max_val = max(values)
+    strategy = counting_strategy(len(values), min_val, max_val)
+    if info is not None:
+        info.update(strategy=strategy, k=max_val - min_val + 1)
+
+    if strategy == 'dense':
+        count = [0] * (max_val - min_val + 1)
+        for v in values:
+            count[v - min_val] += 1
+        slots = range(len(count)) if ascending else range(len(count) - 1, -1, -1)
+        starts, offset = count, min_val
+    else:
+        count = {}
+        for v in values:
+            count[v] = count.get(v, 0) + 1
+        slots = sorted(count, reverse=not ascending)
+        starts, offset = count, 0
+        if info is not None:
+            info['distinct'] = len(count)
+
+    # Exclusive prefix sums in output order, reusing the count storage
+    total = 0
+    for slot in slots:
+        total, starts[slot] = total + starts[slot], total
+    return starts, offset
+
+
+def counting_sort(arr, ascending=True, info=None):
+    """Stable counting sort in O(n + k): one counting pass, prefix sums, and
+    one placement pass that writes every element straight to its final
+    position. Falls back to a dict histogram when the range is sparse; pass
+    a dict as info to learn which strategy ran."""
+    local_arr = working_copy(arr)
     
     if not local_arr:
-        yield local_arr, {}
-        return
+        return local_arr
     
-    max_val = max(local_arr)
-    min_val = min(local_arr)
-    k = max_val - min_val + 1
-    count = [0] * k
+    for i in range(len(local_arr)):
+        yield MARK, i, RED
+
+    source = local_arr[:]
+    starts, offset = _counting_starts(source, ascending, info)
+    for num in source:
+        slot = num - offset
+        pos = starts[slot]
+        starts[slot] = pos + 1
+        local_arr[pos] = num
+        yield WRITE, pos, num
     
-    for i, num in enumerate(local_arr):
-        count[num - min_val] += 1
-        yield local_arr, {i: RED}
-
-    output = []
-    for i, freq in enumerate(count):
-        value = i + min_val
-        output.extend([value] * freq)
-        if len(output) <= len(local_arr):
-            for j in range(len(output)):
-                if j < len(local_arr):
-                    local_arr[j] = output[j]
-            yield local_arr, {len(output)-1: GREEN}
+    return local_arr
+
+
+# Plain, non-yielding kernels with the same semantics as the visual generators.
+# Each takes (arr, ascending) and returns a new sorted list, or array.array for
+# array.array input (see buffers.py).
+
+def bubble_sort_raw(arr, ascending=True):
+    n = len(arr)
+    local_arr = working_copy(arr)
+    for i in range(n):
+        swapped = False
+        for j in range(0, n - i - 1):
+            if (local_arr[j] > local_arr[j + 1] and ascending) or \
+               (local_arr[j] < local_arr[j + 1] and not ascending):
+                local_arr[j], local_arr[j+1] = local_arr[j+1], local_arr[j]
+                swapped = True
+        if not swapped:
+            break
+    return local_arr
+
+def insertion_sort_raw(arr, ascending=True):
+    local_arr = working_copy(arr)
+    for i in range(1, len(local_arr)):
+        key = local_arr[i]
+        j = i - 1
+        while j >= 0 and ((local_arr[j] > key and ascending) or \
+                          (local_arr[j] < key and not ascending)):
+            local_arr[j + 1] = local_arr[j]
+            j -= 1
+        local_arr[j+1] = key
+    return local_arr
+
+def merge_sort_raw(arr, ascending=True):
+    # Bottom-up passes ping-pong between the array and one buffer of the same
+    # size; runs that are already in order are copied instead of merged
+    src = working_copy(arr)
+    n = len(src)
+    dst = zeros_like(src, n)
+    before = operator.lt if ascending else operator.gt
+
+    def merge(src, dst, lo, mid, hi, before=before):
+        i, j, k = lo, mid, lo
+        left_wins = right_wins = 0
+        while i < mid and j < hi:
+            if before(src[j], src[i]):
+                dst[k] = src[j]
+                j += 1
+                k += 1
+                right_wins += 1
+                left_wins = 0
+                if right_wins >= MIN_GALLOP:
+                    key = src[i]
+                    count = _gallop(src, j, hi, lambda x: before(x, key))
+                    dst[k:k + count] = src[j:j + count]
+                    j += count
+                    k += count
+                    right_wins = 0
+            else:
+                dst[k] = src[i]
+                i += 1
+                k += 1
+                left_wins += 1
+                right_wins = 0
+                if left_wins >= MIN_GALLOP:
+                    key = src[j]
+                    count = _gallop(src, i, mid, lambda x: not before(key, x))
+                    dst[k:k + count] = src[i:i + count]
+                    i += count
+                    k += count
+                    left_wins = 0
+        dst[k:k + mid - i] = src[i:mid]
+        dst[k + mid - i:hi] = src[j:hi]
+
+    width = 1
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(mid + width, n)
+            if mid < hi and before(src[mid], src[mid - 1]):
+                merge(src, dst, lo, mid, hi)
+            else:
+                dst[lo:hi] = src[lo:hi]
+        src, dst = dst, src
+        width *= 2
+
+    return src
+
+def _merge_lo(a, lo, mid, hi, before):
+    """Raw counterpart of _merge_lo_steps"""
+    tmp = a[lo:mid]
+    m = mid - lo
+    i, j, k = 0, mid, lo
+    left_wins = right_wins = 0
+    while i < m and j < hi:
+        if before(a[j], tmp[i]):
+            a[k] = a[j]
+            j += 1
+            k += 1
+            right_wins += 1
+            left_wins = 0
+            if right_wins >= MIN_GALLOP:
+                key = tmp[i]
+                count = _gallop(a, j, hi, lambda x: before(x, key))
+                a[k:k + count] = a[j:j + count]
+                j += count
+                k += count
+                right_wins = 0
+        else:
+            a[k] = tmp[i]
+            i += 1
+            k += 1
+            left_wins += 1
+            right_wins = 0
+            if left_wins >= MIN_GALLOP:
+                key = a[j]
+                count = _gallop(tmp, i, m, lambda x: not before(key, x))
+                a[k:k + count] = tmp[i:i + count]
+                i += count
+                k += count
+                left_wins = 0
+    a[k:k + m - i] = tmp[i:]
+
+def _merge_hi(a, lo, mid, hi, before):
+    """Raw counterpart of _merge_hi_steps"""
+    tmp = a[mid:hi]
+    i, j, k = mid - 1, hi - mid - 1, hi - 1
+    left_wins = right_wins = 0
+    while i >= lo and j >= 0:
+        if before(tmp[j], a[i]):
+            a[k] = a[i]
+            i -= 1
+            k -= 1
+            left_wins += 1
+            right_wins = 0
+            if left_wins >= MIN_GALLOP:
+                key = tmp[j]
+                count = _gallop_back(a, lo, i + 1, lambda x: before(key, x))
+                a[k - count + 1:k + 1] = a[i - count + 1:i + 1]
+                i -= count
+                k -= count
+                left_wins = 0
+        else:
+            a[k] = tmp[j]
+            j -= 1
+            k -= 1
+            right_wins += 1
+            left_wins = 0
+            if right_wins >= MIN_GALLOP:
+                key = a[i]
+                count = _gallop_back(tmp, 0, j + 1, lambda x: not before(x, key))
+                a[k - count + 1:k + 1] = tmp[j - count + 1:j + 1]
+                j -= count
+                k -= count
+                right_wins = 0
+    a[k - j:k + 1] = tmp[:j + 1]
+
+def tim_sort_raw(arr, ascending=True):
+    a = working_copy(arr)
+    n = len(a)
+    before = operator.lt if ascending else operator.gt
+    min_run = _min_run(n)
+    runs = []
+
+    def merge_at(i):
+        base_a, len_a = runs[i]
+        base_b, len_b = runs[i + 1]
+        runs[i][1] = len_a + len_b
+        del runs[i + 1]
+        key = a[base_b]
+        skip = _gallop(a, base_a, base_b, lambda x: not before(key, x))
+        base_a += skip
+        if base_a == base_b:
+            return
+        key = a[base_b - 1]
+        end = base_b + _gallop(a, base_b, base_b + len_b, lambda x: before(x, key))
+        if base_b - base_a <= end - base_b:
+            _merge_lo(a, base_a, base_b, end, before)
+        else:
+            _merge_hi(a, base_a, base_b, end, before)
+
+    lo = 0
+    while lo < n:
+        run_hi = lo + 1
+        if run_hi < n:
+            if before(a[run_hi], a[lo]):
+                run_hi += 1
+                while run_hi < n and before(a[run_hi], a[run_hi - 1]):
+                    run_hi += 1
+                a[lo:run_hi] = a[lo:run_hi][::-1]
+            else:
+                run_hi += 1
+                while run_hi < n and not before(a[run_hi], a[run_hi - 1]):
+                    run_hi += 1
+
+        end = min(lo + min_run, n)
+        for i in range(run_hi, end):
+            pivot = a[i]
+            left, right = lo, i
+            while left < right:
+                mid = (left + right) // 2
+                if before(pivot, a[mid]):
+                    right = mid
+                else:
+                    left = mid + 1
+            a[left + 1:i + 1] = a[left:i]
+            a[left] = pivot
+        run_hi = max(run_hi, end)
+
+        runs.append([lo, run_hi - lo])
+        i = _tim_merge_index(runs)
+        while i is not None:
+            merge_at(i)
+            i = _tim_merge_index(runs)
+        lo = run_hi
+
+    i = _tim_merge_index(runs, force=True)
+    while i is not None:
+        merge_at(i)
+        i = _tim_merge_index(runs, force=True)
+
+    return a
+
+def quick_sort_raw(arr, ascending=True):
+    local_arr = working_copy(arr)
+    stack = [(0, len(local_arr) - 1)]
+
+    while stack:
+        low, high = stack.pop()
+
+        if low < high:
+            pivot = local_arr[high]
+            i = low - 1
+
+            for j in range(low, high):
+                if (local_arr[j] <= pivot and ascending) or \
+                   (local_arr[j] > pivot and not ascending):
+                    i += 1
+                    local_arr[i], local_arr[j] = local_arr[j], local_arr[i]
+
+            local_arr[i + 1], local_arr[high] = local_arr[high], local_arr[i + 1]
+            pi = i + 1
+
+            stack.append((low, pi - 1))
+            stack.append((pi + 1, high))
+
+    return local_arr
+
+def intro_sort_raw(arr, ascending=True):
+    # Sorts ascending and reverses for descending, so the inner loops can use
+    # plain < comparisons
+    local_arr = working_copy(arr)
+
+    def median_of_three(a, b, c):
+        if local_arr[b] < local_arr[a]:
+            a, b = b, a
+        if not local_arr[c] < local_arr[b]:
+            return b
+        return c if local_arr[a] < local_arr[c] else a
+
+    def sift_down(lo, root, size):
+        while True:
+            child = 2 * root + 1
+            if child >= size:
+                return
+            if child + 1 < size and local_arr[lo + child] < local_arr[lo + child + 1]:
+                child += 1
+            if not local_arr[lo + root] < local_arr[lo + child]:
+                return
+            local_arr[lo + root], local_arr[lo + child] = local_arr[lo + child], local_arr[lo + root]
+            root = child
+
+    stack = [(0, len(local_arr), _intro_depth_limit(len(local_arr)))]
+    while stack:
+        lo, hi, depth = stack.pop()
+        while hi - lo > INTRO_INSERTION_THRESHOLD:
+            if depth == 0:
+                size = hi - lo
+                for root in range(size // 2 - 1, -1, -1):
+                    sift_down(lo, root, size)
+                for end in range(size - 1, 0, -1):
+                    local_arr[lo], local_arr[lo + end] = local_arr[lo + end], local_arr[lo]
+                    sift_down(lo, 0, end)
+                break
+            depth -= 1
+
+            mid = (lo + hi) // 2
+            if hi - lo > NINTHER_THRESHOLD:
+                step = (hi - lo) // 8
+                p = median_of_three(median_of_three(lo, lo + step, lo + 2 * step),
+                                    median_of_three(mid - step, mid, mid + step),
+                                    median_of_three(hi - 1 - 2 * step, hi - 1 - step, hi - 1))
+            else:
+                p = median_of_three(lo, mid, hi - 1)
+
+            pivot = local_arr[p]
+            lt, i, gt = lo, lo, hi - 1
+            while i <= gt:
+                value = local_arr[i]
+                if value < pivot:
+                    local_arr[lt], local_arr[i] = value, local_arr[lt]
+                    lt += 1
+                    i += 1
+                elif value > pivot:
+                    local_arr[i], local_arr[gt] = local_arr[gt], value
+                    gt -= 1
+                else:
+                    i += 1
+
+            if lt - lo < hi - gt - 1:
+                stack.append((gt + 1, hi, depth))
+                hi = lt
+            else:
+                stack.append((lo, lt, depth))
+                lo = gt + 1
+        else:
+            for i in range(lo + 1, hi):
+                key = local_arr[i]
+                j = i - 1
+                while j >= lo and local_arr[j] > key:
+                    local_arr[j + 1] = local_arr[j]
+                    j -= 1
+                local_arr[j + 1] = key
+
     if not ascending:
-        output.reverse()
+        local_arr.reverse()
+    return local_arr
 
-    for i in range(len(output)):
-        local_arr[i] = output[i]
-        yield local_arr, {i: GREEN}
-    
-    yield local_arr, {}
\ No newline at end of file
+def heap_sort_raw(arr, ascending=True, floyd=False):
+    local_arr = working_copy(arr)
+    n = len(local_arr)
+    before = operator.lt if ascending else operator.gt
+
+    def heapify(arr_ref, n_ref, i_ref):
+        while True:
+            root_idx = i_ref
+            left = 2 * i_ref + 1
+            right = 2 * i_ref + 2
+
+            if ascending:
+                if left < n_ref and arr_ref[root_idx] < arr_ref[left]:
+                    root_idx = left
+                if right < n_ref and arr_ref[root_idx] < arr_ref[right]:
+                    root_idx = right
+            else:
+                if left < n_ref and arr_ref[root_idx] > arr_ref[left]:
+                    root_idx = left
+                if right < n_ref and arr_ref[root_idx] > arr_ref[right]:
+                    root_idx = right
+
+            if root_idx == i_ref:
+                return
+            arr_ref[i_ref], arr_ref[root_idx] = arr_ref[root_idx], arr_ref[i_ref]
+            i_ref = root_idx
+
+    for i in range(n // 2 - 1, -1, -1):
+        heapify(local_arr, n, i)
+
+    if not floyd:
+        for i in range(n - 1, 0, -1):
+            local_arr[i], local_arr[0] = local_arr[0], local_arr[i]
+            heapify(local_arr, i, 0)
+        return local_arr
+
+    # Floyd: move the hole left at the root down to a leaf, then sift the
+    # displaced last element up from there
+    for end in range(n - 1, 0, -1):
+        item = local_arr[end]
+        local_arr[end] = local_arr[0]
+        hole = 0
+        child = 1
+        while child < end:
+            if child + 1 < end and before(local_arr[child], local_arr[child + 1]):
+                child += 1
+            local_arr[hole] = local_arr[child]
+            hole = child
+            child = 2 * hole + 1
+        while hole > 0:
+            parent = (hole - 1) // 2
+            if not before(local_arr[parent], item):
+                break
+            local_arr[hole] = local_arr[parent]
+            hole = parent
+        local_arr[hole] = item
+
+    return local_arr
+
+
+def floyd_heap_sort_raw(arr, ascending=True):
+    return heap_sort_raw(arr, ascending, floyd=True)
+
+def radix_sort_raw(arr, ascending=True, base=RADIX_BASE):
+    local_arr = radix_sort_lsd(working_copy(arr), base)
+    if not ascending:
+        local_arr.reverse()
+    return local_arr
+
+def msd_radix_sort_raw(arr, ascending=True, base=RADIX_BASE):
+    local_arr = working_copy(arr)
+    n = len(local_arr)
+    if n < 2:
+        return local_arr
+
+    min_val = min(local_arr)
+    bits, top_shift = _msd_plan(local_arr, base)
+    mask = base - 1
+    order = range(base) if ascending else range(base - 1, -1, -1)
+
+    stack = [(0, n, top_shift)]
+    while stack:
+        lo, hi, shift = stack.pop()
+        if hi - lo <= MSD_INSERTION_THRESHOLD:
+            local_arr[lo:hi] = like(local_arr, sorted(local_arr[lo:hi], reverse=not ascending))
+            continue
+
+        segment = local_arr[lo:hi]
+        digits = [((x - min_val) >> shift) & mask for x in segment]
+        count = [0] * base
+        for digit in digits:
+            count[digit] += 1
+        if max(count) == hi - lo:
+            if shift:
+                stack.append((lo, hi, shift - bits))
+            continue
+
+        starts = [0] * base
+        pos = lo
+        for digit in order:
+            starts[digit] = pos
+            pos += count[digit]
+        for x, digit in zip(segment, digits):
+            pos = starts[digit]
+            starts[digit] = pos + 1
+            local_arr[pos] = x
+
+        if shift:
+            for digit in order:
+                if count[digit] > 1:
+                    end = starts[digit]
+                    stack.append((end - count[digit], end, shift - bits))
+
+    return local_arr
+
+def bucket_sort_raw(arr, ascending=True):
+    # Buckets are sorted with list.sort: in CPython the C sort beats a
+    # Python-level insertion sort even on the smallest buckets
+    local_arr = working_copy(arr)
+
+    if len(local_arr) < 2:
+        return local_arr
+
+    groups = _bucket_groups(local_arr)
+    if groups is None:
+        return local_arr
+    result, starts, sizes = groups
+
+    for start, size in zip(starts, sizes):
+        if size > 1:
+            result[start:start + size] = sorted(result[start:start + size])
+    if not ascending:
+        result.reverse()
+    return like(local_arr, result)
+
+def selection_sort_raw(arr, ascending=True):
+    local_arr = working_copy(arr)
+    n = len(local_arr)
+
+    for i in range(n):
+        min_idx = i
+
+        for j in range(i + 1, n):
+            if (local_arr[j] < local_arr[min_idx] and ascending) or \
+               (local_arr[j] > local_arr[min_idx] and not ascending):
+                min_idx = j
+
+        if min_idx != i:
+            local_arr[i], local_arr[min_idx] = local_arr[min_idx], local_arr[i]
+
+    return local_arr
+
+def counting_sort_raw(arr, ascending=True, info=None):
+    source = working_copy(arr)
+
+    if not source:
+        return source
+
+    starts, offset = _counting_starts(source, ascending, info)
+    output = zeros_like(source, len(source))
+    for num in source:
+        slot = num - offset
+        pos = starts[slot]
+        starts[slot] = pos + 1
+        output[pos] = num
+    return output
+
+
+# Registries keyed by display name. Visual generators yield steps for the
+# visualizers; raw kernels are the same algorithms without instrumentation.
+VISUAL_SORTS = {
+    'Bubble Sort': bubble_sort,
+    'Insertion Sort': insertion_sort,
+    'Merge Sort': merge_sort,
+    'Tim Sort': tim_sort,
+    'Quick Sort': quick_sort,
+    'Intro Sort': intro_sort,
+    'Heap Sort': heap_sort,
+    'Floyd Heap Sort': floyd_heap_sort,
+    'Radix Sort': radix_sort,
+    'MSD Radix Sort': msd_radix_sort,
+    'Bucket Sort': bucket_sort,
+    'Selection Sort': selection_sort,
+    'Counting Sort': counting_sort
+}
+
+RAW_SORTS = {
+    'Bubble Sort': bubble_sort_raw,
+    'Insertion Sort': insertion_sort_raw,
+    'Merge Sort': merge_sort_raw,
+    'Tim Sort': tim_sort_raw,
+    'Quick Sort': quick_sort_raw,
+    'Intro Sort': intro_sort_raw,
+    'Heap Sort': heap_sort_raw,
+    'Floyd Heap Sort': floyd_heap_sort_raw,
+    'Radix Sort': radix_sort_raw,
+    'MSD Radix Sort': msd_radix_sort_raw,
+    'Bucket Sort': bucket_sort_raw,
+    'Selection Sort': selection_sort_raw,
+    'Counting Sort': counting_sort_raw,
+    'NumPy Radix Sort': radix_sort_np,
+    'NumPy Counting Sort': counting_sort_np
+}
+
+# Raw kernels that take and return ndarrays rather than lists
+NDARRAY_SORTS = {'NumPy Radix Sort', 'NumPy Counting Sort'}
@@ -0,0 +1,302 @@
+"""Binary trace files for recorded sort runs.
+
+A trace holds the initial array, one fixed-width record per step and a full
+array snapshot (keyframe) every `keyframe_interval` steps, so any position can
+be reached by restoring the nearest keyframe and applying at most that many
+records. Files are written in bulk while the generator runs and read back
+through mmap, so a run of tens of millions of steps never lives in memory as
+Python objects.
+
+Layout (little endian):
+    header      HEADER struct, see below
+    initial     int64[n]
+    records     RECORD[step_count]
+    keyframes   int64[keyframe_count][n]   state after (k + 1) * interval steps
+    palette     uint8[palette_count][3]
+"""
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+import buffers
+import steps
+
+MAGIC = b'SORTTRC1'
+FORMAT_VERSION = 1
+# magic, format version, step protocol version, n, step count, keyframe
+# interval, keyframe count, palette count, records offset, keyframes offset,
+# palette offset
+HEADER = struct.Struct('<8sHHQQIIIQQQ')
+RECORD = np.dtype([('op', 'u1'), ('color', 'u1'), ('pad', 'u2'), ('a', '<u4'), ('b', '<i8')])
+
+DEFAULT_KEYFRAME_INTERVAL = 1 << 16
+KEYFRAME_STEPS_PER_ITEM = 2  # keyframes (8n bytes) take at most 1/4 of the records (16 bytes per step)
+FLUSH_EVERY = 1 << 16
+
+DEFAULT_PALETTE = [steps.RED, steps.GREEN, steps.BLUE, steps.YELLOW, steps.PURPLE]
+
+
+class StepEncoder:
+    """Turns steps into RECORD tuples, collecting highlight colors in a palette"""
+
+    def __init__(self):
+        self.palette = list(DEFAULT_PALETTE)
+        self.colors = {color: i for i, color in enumerate(self.palette)}
+
+    def _color(self, color):
+        index = self.colors.get(color)
+        if index is None:
+            index = self.colors[color] = len(self.palette)
+            self.palette.append(color)
+        return index
+
+    def encode(self, step):
+        op = step[0]
+        if op == steps.MARK:
+            return op, self._color(step[2]), 0, step[1], 0
+        if op == steps.RANGE:
+            return op, self._color(step[3]), 0, step[1], step[2]
+        return op, 0, 0, step[1], step[2]
+
+
+class StepReader:
+    """Decodes RECORD rows back into steps; needs records, palette and step_count"""
+
+    def __len__(self):
+        return self.step_count
+
+    def decode(self, record):
+        op, color, _, a, b = record
+        if op == steps.MARK:
+            return op, a, self.palette[color]
+        if op == steps.RANGE:
+            return op, a, b, self.palette[color]
+        return op, a, b
+
+    def iter_steps(self, start=0, stop=None, chunk=FLUSH_EVERY):
+        """Yield decoded steps in [start, stop), decoding the records in chunks"""
+        stop = self.step_count if stop is None else min(stop, self.step_count)
+        decode = self.decode
+        for lo in range(start, stop, chunk):
+            for record in self.records[lo:min(lo + chunk, stop)].tolist():
+                yield decode(record)
+
+
+class TraceWriter(StepEncoder):
+    """Streams steps into a trace file; use as a context manager or call close()"""
+
+    def __init__(self, path, arr, keyframe_interval=None):
+        super().__init__()
+        self.path = path
+        self.state = buffers.working_copy(arr)
+        self.keyframe_interval = keyframe_interval or keyframe_interval_for(len(self.state))
+        self.step_count = 0
+        self.keyframe_count = 0
+        self.pending = []
+
+        self.file = open(path, 'wb')
+        self.file.write(b'\0' * HEADER.size)
+        self.file.write(np.asarray(self.state, dtype=np.int64).tobytes())
+        self.records_offset = HEADER.size + 8 * len(self.state)
+        self.keyframes = tempfile.TemporaryFile()
+
+    def add(self, step):
+        self.pending.append(self.encode(step))
+        steps.apply_data(step, self.state)
+        self.step_count += 1
+
+        if self.step_count % self.keyframe_interval == 0:
+            self._flush()
+            self.keyframes.write(np.asarray(self.state, dtype=np.int64).tobytes())
+            self.keyframe_count += 1
+        elif len(self.pending) >= FLUSH_EVERY:
+            self._flush()
+
+    def _flush(self):
+        if self.pending:
+            self.file.write(np.array(self.pending, dtype=RECORD).tobytes())
+            self.pending = []
+
+    def close(self):
+        if self.file is None:
+            return
+        self._flush()
+        keyframes_offset = self.records_offset + RECORD.itemsize * self.step_count
+        self.keyframes.seek(0)
+        while True:
+            chunk = self.keyframes.read(1 << 20)
+            if not chunk:
+                break
+            self.file.write(chunk)
+        self.keyframes.close()
+        palette_offset = keyframes_offset + 8 * len(self.state) * self.keyframe_count
+        self.file.write(np.array(self.palette, dtype=np.uint8).tobytes())
+
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, steps.PROTOCOL_VERSION, len(self.state),
+                                    self.step_count, self.keyframe_interval, self.keyframe_count,
+                                    len(self.palette), self.records_offset, keyframes_offset,
+                                    palette_offset))
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def keyframe_interval_for(n):
+    """Steps between keyframes for an n-element array. Each keyframe is a full
+    copy of the array, so the interval grows with n."""
+    return max(DEFAULT_KEYFRAME_INTERVAL, KEYFRAME_STEPS_PER_ITEM * n)
+
+
+def record(step_iter, arr, path, keyframe_interval=None):
+    """Write every step of step_iter (starting from arr) to a trace file"""
+    with TraceWriter(path, arr, keyframe_interval) as writer:
+        for step in step_iter:
+            writer.add(step)
+    return path
+
+
+class BackgroundRecording:
+    """Records a trace on a worker thread so the UI stays responsive. Poll
+    done, steps and error; cancel() stops it and deletes the file. arr must
+    not change until the recording is done."""
+
+    def __init__(self, step_iter, arr, path, keyframe_interval=None):
+        self.path = path
+        self.steps = 0
+        self.error = None
+        self.cancelled = threading.Event()
+        self.writer = TraceWriter(path, arr, keyframe_interval)
+        self.thread = threading.Thread(target=self._run, args=(step_iter,), daemon=True)
+        self.thread.start()
+
+    @property
+    def done(self):
+        return not self.thread.is_alive()
+
+    def _run(self, step_iter):
+        writer = self.writer
+        try:
+            with writer:
+                for step in step_iter:
+                    writer.add(step)
+                    if writer.step_count % steps.StepScheduler.CHECK_EVERY == 0:
+                        self.steps = writer.step_count
+                        if self.cancelled.is_set():
+                            return
+                self.steps = writer.step_count
+        except Exception as e:
+            self.error = e
+
+    def cancel(self):
+        self.cancelled.set()
+        self.thread.join()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Trace(StepReader):
+    """Read-only, memory-mapped view of a trace file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, protocol, n, step_count, interval, keyframe_count, palette_count,
+         records_offset, keyframes_offset, palette_offset) = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a sort trace")
+        if version != FORMAT_VERSION or protocol != steps.PROTOCOL_VERSION:
+            raise ValueError(f"{path} uses trace format {version} / protocol {protocol}, "
+                             f"expected {FORMAT_VERSION} / {steps.PROTOCOL_VERSION}")
+        self.n = n
+        self.step_count = step_count
+        self.keyframe_interval = interval
+        self.initial = np.frombuffer(self.mm, dtype=np.int64, count=n, offset=HEADER.size)
+        self.records = np.frombuffer(self.mm, dtype=RECORD, count=step_count, offset=records_offset)
+        self.keyframes = np.frombuffer(self.mm, dtype=np.int64, count=n * keyframe_count,
+                                       offset=keyframes_offset).reshape(keyframe_count, n)
+        palette = np.frombuffer(self.mm, dtype=np.uint8, count=3 * palette_count, offset=palette_offset)
+        self.palette = [tuple(c) for c in palette.reshape(-1, 3).tolist()]
+
+    def state_at(self, position):
+        """Array contents after the first `position` steps"""
+        position = max(0, min(position, self.step_count))
+        k = position // self.keyframe_interval
+        if k > 0:
+            arr = buffers.compact_if_large(self.keyframes[k - 1])
+        else:
+            arr = buffers.compact_if_large(self.initial)
+        for step in self.iter_steps(k * self.keyframe_interval, position):
+            steps.apply_data(step, arr)
+        return arr
+
+    def close(self):
+        self.initial = self.records = self.keyframes = None
+        self.mm.close()
+
+
+class TracePlayer:
+    """Playback cursor over a Trace with stepping, seeking and scrubbing"""
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.position = 0
+        self.arr = buffers.compact_if_large(trace.initial)
+        self.highlights = {}
+
+    def __len__(self):
+        return len(self.trace)
+
+    @property
+    def finished(self):
+        return self.position >= len(self.trace)
+
+    def forward(self, count=1, time_budget=None):
+        """Apply up to count steps and merge their highlights, stopping early
+        once time_budget seconds have passed"""
+        highlights = steps.HighlightSet()
+        stop = min(self.position + count, len(self.trace))
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        done = 0
+        for step in self.trace.iter_steps(self.position, stop, chunk=min(count, FLUSH_EVERY)):
+            highlights.add(steps.apply(step, self.arr))
+            done += 1
+            if deadline is not None and done % steps.StepScheduler.CHECK_EVERY == 0 \
+                    and time.perf_counter() > deadline:
+                break
+        self.position += done
+        self.highlights = highlights
+        return highlights
+
+    def seek(self, position):
+        position = max(0, min(position, len(self.trace)))
+        self.arr[:] = self.trace.state_at(position)
+        self.position = position
+        self.highlights = {}
+        if position > 0:
+            # Show what the step that led here did
+            self.highlights = steps.highlights(next(self.trace.iter_steps(position - 1, position)))
+        return self.highlights
+
+    def back(self, count=1):
+        return self.seek(self.position - count)
+
+    def jump_to_fraction(self, fraction):
+        return self.seek(int(len(self.trace) * fraction))
+
+
+def temp_trace_path(prefix='sort_'):
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix='.trace')
+    os.close(fd)
+    return path
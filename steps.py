@@ -0,0 +1,234 @@
+"""Step protocol emitted by the sort_algos visual generators.
+
+Instead of yielding the whole list plus a highlight dict, every generator
+yields one small tuple per step describing what it just did to its own copy
+of the array. A consumer that starts from the same input and applies the
+steps in order holds an identical array, so each step costs O(1).
+
+    (COMPARE, i, j)           indices i and j were compared
+    (SWAP, i, j)              the values at i and j were exchanged
+    (WRITE, i, value)         value was stored at index i
+    (MARK, i, color)          index i is highlighted
+    (RANGE, lo, hi, color)    indices lo <= i < hi are highlighted
+
+Generators return their final list, so `yield from` callers can pick it up.
+"""
+import time
+
+PROTOCOL_VERSION = 1
+
+COMPARE = 0
+SWAP = 1
+WRITE = 2
+MARK = 3
+RANGE = 4
+
+OP_NAMES = {COMPARE: 'compare', SWAP: 'swap', WRITE: 'write', MARK: 'mark', RANGE: 'range'}
+
+# Highlighting Colors for Sorting
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+YELLOW = (255, 255, 0)
+PURPLE = (128, 0, 128)
+
+COMPARE_COLOR = RED
+MOVE_COLOR = GREEN
+
+
+class ColorRange:
+    """Highlight for a contiguous index range that behaves like a read-only
+    {index: color} dict, so draw code can treat it as color_positions"""
+    __slots__ = ('lo', 'hi', 'color')
+
+    def __init__(self, lo, hi, color):
+        self.lo = lo
+        self.hi = hi
+        self.color = color
+
+    def __contains__(self, i):
+        return self.lo <= i < self.hi
+
+    def __getitem__(self, i):
+        if self.lo <= i < self.hi:
+            return self.color
+        raise KeyError(i)
+
+    def get(self, i, default=None):
+        return self.color if self.lo <= i < self.hi else default
+
+    def __len__(self):
+        return max(self.hi - self.lo, 0)
+
+    def __iter__(self):
+        return iter(range(self.lo, self.hi))
+
+    def keys(self):
+        return range(self.lo, self.hi)
+
+    def items(self):
+        return ((i, self.color) for i in range(self.lo, self.hi))
+
+
+class HighlightSet:
+    """Highlights of several steps merged for a single frame. Later steps win,
+    and at most one range is kept so merging stays O(1) per step."""
+    __slots__ = ('points', 'range')
+
+    def __init__(self):
+        self.points = {}
+        self.range = None
+
+    def add(self, highlights):
+        if isinstance(highlights, ColorRange):
+            self.range = highlights
+        else:
+            self.points.update(highlights)
+
+    def clear(self):
+        self.points.clear()
+        self.range = None
+
+    def __contains__(self, i):
+        return i in self.points or (self.range is not None and i in self.range)
+
+    def __getitem__(self, i):
+        color = self.points.get(i)
+        if color is None:
+            if self.range is None:
+                raise KeyError(i)
+            return self.range[i]
+        return color
+
+    def get(self, i, default=None):
+        color = self.points.get(i)
+        if color is None and self.range is not None:
+            color = self.range.get(i)
+        return default if color is None else color
+
+    def __len__(self):
+        return len(self.points) + (len(self.range) if self.range is not None else 0)
+
+    def __iter__(self):
+        yield from self.points
+        if self.range is not None:
+            yield from self.range
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        return ((i, self[i]) for i in self)
+
+
+def highlights(step):
+    """Return the highlights of a step without touching any array"""
+    op = step[0]
+    if op == COMPARE:
+        return {step[1]: COMPARE_COLOR, step[2]: COMPARE_COLOR}
+    if op == SWAP:
+        return {step[1]: MOVE_COLOR, step[2]: MOVE_COLOR}
+    if op == WRITE:
+        return {step[1]: MOVE_COLOR}
+    if op == MARK:
+        return {step[1]: step[2]}
+    if op == RANGE:
+        return ColorRange(step[1], step[2], step[3])
+    raise ValueError(f"Unknown step op {op!r}")
+
+
+def apply(step, arr):
+    """Apply one step to arr in place and return its highlights"""
+    op = step[0]
+    if op == SWAP:
+        i, j = step[1], step[2]
+        arr[i], arr[j] = arr[j], arr[i]
+    elif op == WRITE:
+        arr[step[1]] = step[2]
+    return highlights(step)
+
+
+def apply_data(step, arr):
+    """Apply only the data movement of a step, skipping highlight bookkeeping"""
+    op = step[0]
+    if op == SWAP:
+        i, j = step[1], step[2]
+        arr[i], arr[j] = arr[j], arr[i]
+    elif op == WRITE:
+        arr[step[1]] = step[2]
+
+
+def replay(steps, arr):
+    """Apply every step to a copy of arr and return the final list"""
+    local_arr = list(arr)
+    for step in steps:
+        op = step[0]
+        if op == SWAP:
+            i, j = step[1], step[2]
+            local_arr[i], local_arr[j] = local_arr[j], local_arr[i]
+        elif op == WRITE:
+            local_arr[step[1]] = step[2]
+    return local_arr
+
+
+def frames(steps, arr):
+    """Adapt a step stream to the old (list, {index: color}) frame format"""
+    local_arr = list(arr)
+    for step in steps:
+        yield local_arr, apply(step, local_arr)
+    yield local_arr, {}
+
+
+class StepScheduler:
+    """Advances a step stream several steps per frame.
+
+    Each call to advance() applies `speed` steps (fractions carry over to the
+    next frame) but stops early once `time_budget` seconds have been spent, so
+    a high speed never drags the frame rate down. The highlights of all steps
+    applied in a frame are merged so the frame can be drawn once.
+    """
+    CHECK_EVERY = 64  # steps between clock reads
+
+    def __init__(self, step_iter, arr, speed=1.0, time_budget=0.004):
+        self.step_iter = iter(step_iter)
+        self.arr = arr
+        self.speed = speed
+        self.time_budget = time_budget
+        self.carry = 0.0
+        self.steps_done = 0
+        self.finished = False
+
+    def advance(self):
+        """Apply this frame's steps; returns None when no step was due"""
+        if self.finished:
+            return None
+        self.carry += self.speed
+        count = int(self.carry)
+        self.carry -= count
+        if count == 0:
+            return None
+
+        highlights = HighlightSet()
+        deadline = time.perf_counter() + self.time_budget
+        arr = self.arr
+        done = 0
+        for step in self.step_iter:
+            highlights.add(apply(step, arr))
+            done += 1
+            if done >= count:
+                break
+            if done % self.CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                self.carry = 0.0  # don't build up a backlog we can't draw
+                break
+        else:
+            self.finished = True
+        self.steps_done += done
+        return highlights
+
+    def finish(self):
+        """Apply every remaining step at once, skipping highlight bookkeeping"""
+        arr = self.arr
+        for step in self.step_iter:
+            apply_data(step, arr)
+            self.steps_done += 1
+        self.finished = True
@@ -0,0 +1,55 @@
+"""Checks counting sort's dense/sparse choice on both sides of the cutoff,
+with negative keys, across the visual, raw and NumPy kernels; run with
+pytest."""
+import pytest
+
+import buffers
+import sort_algos
+import steps
+
+N = 10
+CUTOFF = sort_algos.COUNTING_SPARSE_RATIO * N + 256  # widest range still counted densely
+
+
+def values_spanning(k, lo=-1000):
+    """N values from lo to lo + k - 1, so the key range is exactly k"""
+    inner = [lo + (i * 37) % k for i in range(N - 2)]
+    return [lo + k - 1] + inner + [lo]
+
+
+def run_counting(kernel, values, ascending, info):
+    if kernel == 'visual':
+        return steps.replay(sort_algos.counting_sort(values, ascending, info), values)
+    if kernel == 'raw':
+        return buffers.to_list(sort_algos.counting_sort_raw(values, ascending, info))
+    return sort_algos.counting_sort_np(values, ascending, info).tolist()
+
+
+def test_strategy_cutoff():
+    assert sort_algos.counting_strategy(N, -5, -5 + CUTOFF - 1) == 'dense'
+    assert sort_algos.counting_strategy(N, -5, -5 + CUTOFF) == 'sparse'
+    assert sort_algos.counting_strategy(1, -(2 ** 63), 2 ** 63 - 1) == 'sparse'
+
+
+@pytest.mark.parametrize('kernel', ['visual', 'raw', 'numpy'])
+@pytest.mark.parametrize('ascending', [True, False])
+@pytest.mark.parametrize('k, strategy', [(CUTOFF - 1, 'dense'), (CUTOFF, 'dense'),
+                                         (CUTOFF + 1, 'sparse'), (10 * CUTOFF, 'sparse')])
+def test_reports_strategy_and_sorts_negative_keys(kernel, ascending, k, strategy):
+    values = values_spanning(k)
+    info = {}
+    assert run_counting(kernel, values, ascending, info) == sorted(values, reverse=not ascending)
+    assert info['strategy'] == strategy
+    assert info['k'] == k
+    if strategy == 'sparse':
+        assert info['distinct'] == len(set(values))
+    else:
+        assert 'distinct' not in info
+
+
+@pytest.mark.parametrize('kernel', ['visual', 'raw', 'numpy'])
+def test_duplicates_and_all_negative(kernel):
+    values = [-3, -7, -3, -1, -7, -7, -2, -3]
+    info = {}
+    assert run_counting(kernel, values, True, info) == sorted(values)
+    assert info == {'strategy': 'dense', 'k': 7}
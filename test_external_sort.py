@@ -0,0 +1,23 @@
+"""Round trips through external_sort with a memory cap small enough to force
+several runs and merge passes; run with pytest."""
+import pytest
+
+import external_sort
+import workloads
+
+
+@pytest.mark.parametrize('suffix', ['.bin', '.txt'])
+@pytest.mark.parametrize('ascending', [True, False])
+def test_round_trip_matches_sorted(tmp_path, suffix, ascending):
+    values = workloads.make('uniform', 1000, -(1 << 40), 1 << 40, seed=3)
+    input_path = str(tmp_path / f"input{suffix}")
+    output_path = str(tmp_path / f"output{suffix}")
+    external_sort.write_ints(input_path, values)
+
+    # 50 items per run gives 20 runs, merged two at a time over 5 passes
+    done = external_sort.external_sort(input_path, output_path, memory_limit=50 * external_sort.ITEM_BYTES,
+                                       fan_in=2, ascending=ascending, tmp_dir=str(tmp_path))
+
+    assert external_sort.read_ints(output_path).tolist() == sorted(values, reverse=not ascending)
+    assert done['runs'] == 20 and done['passes'] == 5
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([f"input{suffix}", f"output{suffix}"])
@@ -0,0 +1,67 @@
+"""Checks that ColumnAggregates.update keeps every column's min, max and sum
+equal to a fresh rebuild through random writes and swaps; run with pytest."""
+import random
+
+import numpy as np
+import pytest
+
+import lod
+
+
+def assert_matches_rebuild(agg, lst):
+    fresh = lod.ColumnAggregates(lst, agg.columns)
+    assert agg.values.tolist() == list(lst)
+    assert agg.min.tolist() == fresh.min.tolist()
+    assert agg.max.tolist() == fresh.max.tolist()
+    assert agg.sum.tolist() == fresh.sum.tolist()
+
+
+@pytest.mark.parametrize('n, columns', [(1000, 7), (1000, 1000), (997, 64), (50, 1)])
+def test_update_matches_rebuild_after_random_batches(n, columns):
+    rng = random.Random(n * columns)
+    lst = [rng.randint(-100, 100) for _ in range(n)]
+    agg = lod.ColumnAggregates(lst, columns)
+    for _ in range(200):
+        touched = []
+        for _ in range(rng.randint(1, 20)):
+            i = rng.randrange(n)
+            if rng.random() < 0.5:
+                j = rng.randrange(n)
+                lst[i], lst[j] = lst[j], lst[i]
+                touched += [i, j]
+            else:
+                lst[i] = rng.randint(-150, 150)
+                touched.append(i)
+        agg.update(lst, touched)  # may repeat an index, like a step batch
+        assert_matches_rebuild(agg, lst)
+
+
+def test_overwriting_column_extremes_rescans_it():
+    lst = list(range(100))
+    agg = lod.ColumnAggregates(lst, 10)  # column c holds 10c .. 10c + 9
+    lst[30], lst[39] = 35, 34  # both extremes of column 3 move inward
+    agg.update(lst, [30, 39])
+    assert (agg.min[3], agg.max[3]) == (31, 38)
+    assert_matches_rebuild(agg, lst)
+
+    lst[55] = -1000  # a new minimum and then losing it again
+    agg.update(lst, [55])
+    assert agg.min[5] == -1000
+    lst[55] = 55
+    agg.update(lst, {55})
+    assert agg.min[5] == 50
+    assert_matches_rebuild(agg, lst)
+
+
+def test_update_ignores_unchanged_and_empty():
+    lst = [4, 4, 1, 9]
+    agg = lod.ColumnAggregates(lst, 2)
+    agg.update(lst, [])
+    agg.update(lst, [0, 1, 2, 3])
+    assert_matches_rebuild(agg, lst)
+    assert np.allclose(agg.mean, [4, 5])
+
+
+def test_needs_an_element_per_column():
+    with pytest.raises(ValueError):
+        lod.ColumnAggregates([1, 2, 3], 4)
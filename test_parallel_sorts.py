@@ -0,0 +1,26 @@
+"""Runs both multi-process engines on the pool, with min_size=0 so even tiny
+inputs are split across workers; run with pytest."""
+import pytest
+
+import parallel_sorts
+import workloads
+
+ENGINES = [parallel_sorts.parallel_merge_sort, parallel_sorts.sample_sort]
+INPUTS = {
+    'empty': [],
+    'single': [5],
+    'fewer than workers': [3, -1, 2],
+    'all equal': [9] * 100,
+    'few unique': workloads.make('few_unique', 5000, -50, 50, seed=1),
+    'uniform': workloads.make('uniform', 5000, -(1 << 40), 1 << 40, seed=2),
+    'reversed': workloads.make('reversed', 5000, 0, 1000, seed=3),
+}
+
+
+@pytest.mark.parametrize('ascending', [True, False])
+@pytest.mark.parametrize('case', INPUTS)
+@pytest.mark.parametrize('engine', ENGINES, ids=lambda engine: engine.__name__)
+def test_engine_sorts_on_two_workers(engine, case, ascending):
+    values = INPUTS[case]
+    out = engine(values, ascending, workers=2, min_size=0)
+    assert out.tolist() == sorted(values, reverse=not ascending)
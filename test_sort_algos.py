@@ -0,0 +1,62 @@
+"""Checks every registered kernel against sorted(), and that the visual
+generators and raw kernels of every algorithm sort identically, on list and
+array('q') input; run with pytest."""
+import numpy as np
+import pytest
+
+import benchmark
+import buffers
+import sort_algos
+import steps
+
+INPUTS = {
+    'empty': [],
+    'single': [42],
+    'all equal': [7] * 33,
+    'negative': [-3, -1, -200, -7, -1, -50, -3],
+    'mixed': [5, -4, 0, 17, -4, 3, 1000, -999, 2],
+    'int64 extremes': [2 ** 63 - 1, -(2 ** 63), 0, -1, 1, 2 ** 63 - 1, -(2 ** 63)],
+    'random': benchmark.make_input(300, 0, -1000, 1000),
+}
+
+
+def storage(values, kind):
+    return buffers.compact(values) if kind == 'array' else list(values)
+
+
+@pytest.mark.parametrize('kind', benchmark.STORAGES)
+@pytest.mark.parametrize('ascending', [True, False])
+@pytest.mark.parametrize('case', INPUTS)
+@pytest.mark.parametrize('name', sort_algos.RAW_SORTS)
+def test_raw_kernel_sorts(name, case, ascending, kind):
+    values = INPUTS[case]
+    data = storage(values, kind)
+    out = sort_algos.RAW_SORTS[name](data, ascending)
+    if name in sort_algos.NDARRAY_SORTS:
+        assert isinstance(out, np.ndarray)
+    assert buffers.to_list(out) == sorted(values, reverse=not ascending)
+    assert list(data) == values  # kernels never modify their input
+
+
+@pytest.mark.parametrize('kind', benchmark.STORAGES)
+@pytest.mark.parametrize('ascending', [True, False])
+@pytest.mark.parametrize('case', INPUTS)
+@pytest.mark.parametrize('name', sort_algos.VISUAL_SORTS)
+def test_visual_steps_sort(name, case, ascending, kind):
+    values = INPUTS[case]
+    data = storage(values, kind)
+    replayed = steps.replay(sort_algos.VISUAL_SORTS[name](data, ascending), data)
+    assert list(replayed) == sorted(values, reverse=not ascending)
+    assert list(data) == values
+
+
+@pytest.mark.parametrize('name', sorted(sort_algos.NDARRAY_SORTS))
+def test_ndarray_kernel_takes_ndarray(name):
+    values = INPUTS['random']
+    out = sort_algos.RAW_SORTS[name](np.array(values, dtype=np.int64))
+    assert out.dtype == np.int64
+    assert out.tolist() == sorted(values)
+
+
+def test_visual_and_raw_kernels_agree():
+    assert benchmark.check_equivalence() == []
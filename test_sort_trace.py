@@ -0,0 +1,73 @@
+"""Checks that trace keyframes restore the same state as replaying the steps,
+and that traces from another format or protocol version are refused; run
+with pytest."""
+import struct
+
+import pytest
+
+import sort_algos
+import sort_trace
+import steps
+import workloads
+
+INTERVAL = 7
+
+
+@pytest.fixture(params=['Quick Sort', 'Merge Sort'])  # swaps and writes
+def recorded(tmp_path, request):
+    arr = workloads.make('uniform', 40, -100, 100, seed=4)
+    step_list = list(sort_algos.VISUAL_SORTS[request.param](arr, True))
+    path = str(tmp_path / 'run.trace')
+    sort_trace.record(iter(step_list), arr, path, keyframe_interval=INTERVAL)
+    trace = sort_trace.Trace(path)
+    yield arr, step_list, trace
+    trace.close()
+
+
+def test_state_at_matches_replay_around_keyframes(recorded):
+    arr, step_list, trace = recorded
+    assert len(trace) == len(step_list)
+    assert trace.keyframe_interval == INTERVAL
+    assert len(trace.keyframes) == len(step_list) // INTERVAL
+
+    positions = {0, len(step_list)}
+    for boundary in range(INTERVAL, len(step_list) + 1, INTERVAL):
+        positions.update((boundary - 1, boundary, boundary + 1))
+    for position in sorted(p for p in positions if p <= len(step_list)):
+        expected = steps.replay(iter(step_list[:position]), arr)
+        assert list(trace.state_at(position)) == expected, position
+
+
+def test_player_seeks_back_and_forth(recorded):
+    arr, step_list, trace = recorded
+    player = sort_trace.TracePlayer(trace)
+    for position in (len(step_list), 3 * INTERVAL, 3 * INTERVAL + 2, 1, 0):
+        player.seek(position)
+        assert list(player.arr) == steps.replay(iter(step_list[:position]), arr)
+    player.forward(INTERVAL + 3)
+    assert list(player.arr) == steps.replay(iter(step_list[:INTERVAL + 3]), arr)
+
+
+def rewrite_header(path, **fields):
+    names = ['magic', 'version', 'protocol']
+    with open(path, 'r+b') as f:
+        header = list(sort_trace.HEADER.unpack(f.read(sort_trace.HEADER.size)))
+        for name, value in fields.items():
+            header[names.index(name)] = value
+        f.seek(0)
+        f.write(sort_trace.HEADER.pack(*header))
+
+
+@pytest.mark.parametrize('field, value', [
+    ('version', sort_trace.FORMAT_VERSION + 1),
+    ('protocol', steps.PROTOCOL_VERSION + 1),
+    ('magic', b'NOTATRC1'),
+])
+def test_refuses_other_versions(tmp_path, field, value):
+    path = str(tmp_path / 'run.trace')
+    sort_trace.record(sort_algos.insertion_sort([3, 1, 2], True), [3, 1, 2], path)
+    sort_trace.Trace(path).close()
+
+    rewrite_header(path, **{field: value})
+    with pytest.raises(ValueError):
+        sort_trace.Trace(path)
@@ -0,0 +1,48 @@
+"""Checks that TimingSeries stays within its capacity and that points()
+keeps every column's extremes; run with pytest."""
+import math
+
+import numpy as np
+
+import timing_series
+
+
+def test_storage_stays_bounded():
+    series = timing_series.TimingSeries(capacity=64)
+    for i in range(100_000):
+        series.append(i, i % 97)
+        assert series.size <= 64
+    assert series.xs.shape == series.ys.shape == (64,)
+
+    xs, ys = series.arrays()
+    assert len(xs) <= 65
+    assert xs[0] == 0 and xs[-1] == 99_999  # the first and newest samples survive
+    stored = xs[:series.size]
+    assert np.all(np.diff(stored) == series.stride)  # evenly thinned
+    assert series.max_y() == 96
+
+
+def test_points_keep_each_columns_min_and_max():
+    series = timing_series.TimingSeries(capacity=4096)
+    for i in range(3000):
+        series.append(i * 0.01, math.sin(i / 7) * 100 + (i % 13))
+    columns = 50
+    out_x, out_y = series.points(columns)
+    assert len(out_x) == len(out_y) <= 2 * columns
+    assert out_x[0] == 0.0 and out_x[-1] == 1.0
+    assert np.all(np.diff(out_x) >= 0)
+
+    xs, ys = series.arrays()
+    buckets = np.minimum(((xs - xs[0]) / (xs[-1] - xs[0]) * columns).astype(np.int64), columns - 1)
+    expected = [(ys[buckets == b].min(), ys[buckets == b].max()) for b in np.unique(buckets)]
+    assert list(zip(out_y[0::2], out_y[1::2])) == expected
+
+
+def test_points_pass_short_series_through():
+    series = timing_series.TimingSeries()
+    assert not series
+    for i in range(10):
+        series.append(i, -i)
+    out_x, out_y = series.points(100)
+    assert out_x.tolist() == [i / 9 for i in range(10)]
+    assert out_y.tolist() == [-i for i in range(10)]
@@ -0,0 +1,74 @@
+"""Checks TraceCache's LRU order, byte budget and counters, and that cached
+step streams replay the original run; run with pytest."""
+import buffers
+import sort_algos
+import steps
+import trace_cache
+
+
+def test_evicts_least_recently_used_first():
+    cache = trace_cache.TraceCache(max_bytes=300)
+    for key in 'abc':
+        assert cache.put(key, key.upper(), 100)
+    assert cache.get('a') == 'A'  # now b is the least recently used
+    assert cache.put('d', 'D', 100)
+    assert list(cache.entries) == ['c', 'a', 'd']
+    assert cache.evictions == 1
+
+    assert cache.put('e', 'E', 200)
+    assert list(cache.entries) == ['d', 'e']
+    assert cache.evictions == 3
+
+
+def test_stays_within_byte_budget():
+    cache = trace_cache.TraceCache(max_bytes=1000)
+    for i in range(50):
+        cache.put(i, i, 70 + i % 5 * 30)
+        assert cache.nbytes == sum(nbytes for _, nbytes in cache.entries.values()) <= 1000
+
+    cache.put(49, 'replaced', 10)  # replacing a key does not count its old size
+    assert cache.nbytes == sum(nbytes for _, nbytes in cache.entries.values())
+
+
+def test_rejects_entry_over_whole_budget():
+    cache = trace_cache.TraceCache(max_bytes=100)
+    assert cache.put('small', 1, 60)
+    assert not cache.put('huge', 2, 101)
+    assert cache.get('huge') is None
+    assert cache.get('small') == 1
+    assert cache.nbytes == 60 and cache.evictions == 0
+
+    assert not cache.put('small', 3, 500)  # an oversized replacement drops the old value
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_counts_hits_and_misses():
+    cache = trace_cache.TraceCache()
+    assert cache.get('x') is None
+    cache.put('x', 1, 10)
+    cache.get('x')
+    cache.get('x')
+    cache.get('y')
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert cache.stats_text().startswith("Cache: 2 hits, 2 misses")
+
+
+def test_key_covers_algorithm_direction_and_values():
+    arr = [3, 1, 2]
+    key = trace_cache.make_key('Merge Sort', arr, True)
+    assert key == trace_cache.make_key('Merge Sort', buffers.compact(arr), True)
+    assert key != trace_cache.make_key('Merge Sort', arr, False)
+    assert key != trace_cache.make_key('Quick Sort', arr, True)
+    assert key != trace_cache.make_key('Merge Sort', [3, 2, 1], True)
+
+
+def test_steps_replays_cached_run_per_direction():
+    cache = trace_cache.TraceCache()
+    arr = [5, -2, 9, 0, 5, 1]
+    for ascending in (True, False):
+        first = list(cache.steps('Quick Sort', sort_algos.quick_sort, arr, ascending))
+        assert cache.misses == (1 if ascending else 2)
+        again = list(cache.steps('Quick Sort', sort_algos.quick_sort, arr, ascending))
+        assert again == first
+        assert steps.replay(iter(again), arr) == sorted(arr, reverse=not ascending)
+    assert cache.hits == 2 and len(cache) == 2
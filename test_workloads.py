@@ -0,0 +1,69 @@
+"""Checks every workload generator's range, determinism and shape; run with
+pytest."""
+import numpy as np
+import pytest
+
+import workloads
+
+RANGES = [(0, 100), (-50, 50), (7, 7), (-(1 << 40), 1 << 40)]
+BOUNDED = [name for name in workloads.WORKLOAD_NAMES if name != 'sparse']
+
+
+@pytest.mark.parametrize('n', [0, 1, 2, 1000])
+@pytest.mark.parametrize('min_val, max_val', RANGES)
+@pytest.mark.parametrize('name', workloads.WORKLOAD_NAMES)
+def test_size_range_and_dtype(name, min_val, max_val, n):
+    a = workloads.make_array(name, n, min_val, max_val, seed=0)
+    assert a.dtype == np.int64 and a.shape == (n,)
+    if n:
+        assert a.min() >= min_val
+        if name in BOUNDED:
+            assert a.max() <= max_val
+
+
+@pytest.mark.parametrize('name', workloads.WORKLOAD_NAMES)
+def test_same_seed_same_output(name):
+    first = workloads.make(name, 500, -100, 100, seed=42)
+    assert workloads.make(name, 500, -100, 100, seed=42) == first
+    assert isinstance(first, list) and all(type(v) is int for v in first)
+    if name not in ('sawtooth', 'organ_pipe'):  # these two are deterministic shapes
+        assert workloads.make(name, 500, -100, 100, seed=43) != first
+
+
+def test_shapes():
+    n, lo, hi = 1000, -500, 500
+
+    def make(name):
+        return workloads.make_array(name, n, lo, hi, seed=5)
+
+    assert np.all(np.diff(make('sorted')) >= 0)
+    assert np.all(np.diff(make('reversed')) <= 0)
+
+    nearly = make('nearly_sorted')
+    assert np.count_nonzero(nearly != np.sort(nearly)) <= 2 * (n // 100)
+    assert np.any(np.diff(nearly) < 0)
+
+    saw = make('sawtooth')
+    assert np.count_nonzero(np.diff(saw) < 0) == workloads.SAWTOOTH_TEETH - 1
+    assert saw.min() == lo and saw.max() == hi
+
+    pipe = make('organ_pipe')
+    peak = int(np.argmax(pipe))
+    assert np.all(np.diff(pipe[:peak + 1]) >= 0) and np.all(np.diff(pipe[peak:]) <= 0)
+
+    assert len(np.unique(make('few_unique'))) <= workloads.FEW_UNIQUE_VALUES
+
+    zipf = make('zipf')
+    assert np.count_nonzero(zipf == lo) > n // 4  # most mass at min_val
+
+    gauss = make('gaussian')
+    assert abs(np.median(gauss)) < (hi - lo) / 20
+
+    sparse = make('sparse')
+    assert sparse.max() - sparse.min() > 4 * (hi - lo)
+
+
+def test_unknown_workload():
+    with pytest.raises(ValueError):
+        workloads.make('bogus', 10, 0, 1)
+    assert workloads.next_workload(workloads.WORKLOAD_NAMES[-1]) == workloads.WORKLOAD_NAMES[0]
@@ -0,0 +1,87 @@
+"""Fixed-memory timing series for the comparison chart.
+
+A TimingSeries holds at most `capacity` (x, y) samples no matter how long a
+race runs: once full it drops every other sample and from then on only
+keeps every stride-th new one, doubling the stride each time. The newest
+sample is always kept so the end of the line is exact. points() reduces the
+stored samples to a min/max pair per pixel column for drawing.
+"""
+import threading
+
+import numpy as np
+
+
+class TimingSeries:
+
+    def __init__(self, capacity=2048):
+        self.capacity = capacity - capacity % 2
+        self.xs = np.empty(self.capacity, dtype=np.float64)
+        self.ys = np.empty(self.capacity, dtype=np.float64)
+        self.size = 0
+        self.stride = 1
+        self.pending = 0  # samples skipped since the last stored one
+        self.last = None
+        self.lock = threading.Lock()  # the thread backend appends from workers
+
+    def __bool__(self):
+        return self.last is not None
+
+    def append(self, x, y):
+        with self.lock:
+            self.last = (x, y)
+            self.pending += 1
+            if self.pending < self.stride:
+                return
+            self.pending = 0
+            if self.size == self.capacity:
+                # Keep the even samples: the first one stays and, with the new
+                # one, the spacing is a whole (doubled) stride throughout
+                half = self.capacity // 2
+                self.xs[:half] = self.xs[0::2]
+                self.ys[:half] = self.ys[0::2]
+                self.size = half
+                self.stride *= 2
+            self.xs[self.size] = x
+            self.ys[self.size] = y
+            self.size += 1
+
+    def max_y(self):
+        if self.last is None:
+            return 0.0
+        with self.lock:
+            stored = self.ys[:self.size].max() if self.size else self.last[1]
+        return max(stored, self.last[1])
+
+    def arrays(self):
+        """Copies of the stored samples plus the newest one"""
+        with self.lock:
+            xs = self.xs[:self.size].copy()
+            ys = self.ys[:self.size].copy()
+            if self.pending and self.last is not None:
+                xs = np.append(xs, self.last[0])
+                ys = np.append(ys, self.last[1])
+        return xs, ys
+
+    def points(self, columns):
+        """Return (xs, ys) normalized to 0..1 in x and reduced to at most a
+        min/max pair per column, ready to be scaled and drawn as one line"""
+        xs, ys = self.arrays()
+        if len(xs) < 2:
+            return xs, ys
+        span = xs[-1] - xs[0]
+        if span <= 0:
+            return np.zeros_like(xs), ys
+        xs = (xs - xs[0]) / span
+        if len(xs) <= 2 * columns:
+            return xs, ys
+
+        buckets = np.minimum((xs * columns).astype(np.int64), columns - 1)
+        starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+        lows = np.minimum.reduceat(ys, starts)
+        highs = np.maximum.reduceat(ys, starts)
+        bucket_x = (buckets[starts] + 0.5) / columns
+        # Visit each column's low then high, keeping the line monotonic in x
+        out_x = np.repeat(bucket_x, 2)
+        out_y = np.column_stack((lows, highs)).ravel()
+        out_x[0], out_x[-1] = 0.0, 1.0
+        return out_x, out_y
@@ -0,0 +1,166 @@
+"""In-memory LRU cache of finished sort runs.
+
+Entries are keyed by (algorithm, input hash, ascending), where the input
+hash is a digest of the array's int64 contents, so a run on an array with
+the same values is recognised however the array is stored. The cache holds
+at most max_bytes; adding an entry evicts the least recently used ones
+until it fits, and entries larger than the whole budget are not kept.
+
+Individual mode caches step streams: steps() replays a cached run, or
+records the generator's steps as they stream through (as sort_trace
+records, 16 bytes per step) and caches them once the run completes.
+Comparison mode caches each algorithm's final timing series the same way.
+
+    cache = trace_cache.get_cache()
+    step_iter = cache.steps('Merge Sort', sort_algos.merge_sort, arr, ascending)
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import sort_trace
+
+DEFAULT_MAX_BYTES = 64 << 20
+ENTRY_OVERHEAD = 256  # rough bytes for an entry's key and bookkeeping
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def input_hash(arr):
+    """Digest of arr's values as int64"""
+    return hashlib.blake2b(np.ascontiguousarray(arr, dtype=np.int64), digest_size=16).hexdigest()
+
+
+def make_key(algorithm, arr, ascending=True):
+    return algorithm, input_hash(arr), ascending
+
+
+class CachedTrace(sort_trace.StepReader):
+    """A recorded step stream held in memory"""
+
+    def __init__(self, records, palette):
+        self.records = records
+        self.palette = palette
+        self.step_count = len(records)
+
+    @property
+    def nbytes(self):
+        return self.records.nbytes + ENTRY_OVERHEAD
+
+
+class TraceRecorder(sort_trace.StepEncoder):
+    """Encodes steps into RECORD rows, giving up once they pass max_bytes"""
+
+    def __init__(self, max_bytes):
+        super().__init__()
+        self.max_steps = max_bytes // sort_trace.RECORD.itemsize
+        self.chunks = []
+        self.pending = []
+        self.step_count = 0
+
+    @property
+    def overflowed(self):
+        return self.step_count > self.max_steps
+
+    def add(self, step):
+        self.step_count += 1
+        if self.overflowed:
+            self.chunks, self.pending = [], []
+            return
+        self.pending.append(self.encode(step))
+        if len(self.pending) >= sort_trace.FLUSH_EVERY:
+            self._flush()
+
+    def _flush(self):
+        if self.pending:
+            self.chunks.append(np.array(self.pending, dtype=sort_trace.RECORD))
+            self.pending = []
+
+    def finish(self):
+        """The recorded trace, or None if it did not fit"""
+        if self.overflowed:
+            return None
+        self._flush()
+        records = np.concatenate(self.chunks) if self.chunks else np.empty(0, dtype=sort_trace.RECORD)
+        return CachedTrace(records, list(self.palette))
+
+
+class TraceCache:
+    """Byte-budgeted LRU map; safe to use from several threads"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, nbytes), least recently used first
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """The cached value for key, or None; counts a hit or a miss"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        """Cache value, evicting least recently used entries until it fits"""
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if nbytes > self.max_bytes:
+                return False
+            while self.nbytes + nbytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+            self.entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            return True
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def steps(self, algorithm, func, arr, ascending=True):
+        """Steps of func(arr, ascending): the cached trace on a hit, otherwise
+        the generator itself, cached once it has run to the end"""
+        key = make_key(algorithm, arr, ascending)
+        trace = self.get(key)
+        if trace is not None:
+            return trace.iter_steps()
+        return self._record(key, func(arr, ascending))
+
+    def _record(self, key, step_iter):
+        recorder = TraceRecorder(self.max_bytes)
+        for step in step_iter:
+            recorder.add(step)
+            yield step
+        trace = recorder.finish()
+        if trace is not None:
+            self.put(key, trace, trace.nbytes)
+
+    def stats_text(self):
+        return f"Cache: {self.hits} hits, {self.misses} misses, {self.nbytes / (1 << 20):.1f} MiB"
+
+
+def get_cache():
+    """The cache shared by both visualizers"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TraceCache()
+        return _cache
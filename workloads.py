@@ -0,0 +1,116 @@
+"""Input distributions for the visualizers and the benchmark.
+
+Uniform random data hides the worst cases of several kernels (Lomuto quick
+sort on sorted or duplicate-heavy input, bucket sort on skewed input), so
+every generator here builds its array with NumPy from a seedable Generator.
+Each one takes (rng, n, min_val, max_val) and returns an int64 ndarray with
+values in [min_val, max_val], except 'sparse', which deliberately spreads
+its values over a range much wider than the array.
+
+    lst = workloads.make('nearly_sorted', 1000, 0, 100, seed=0)
+"""
+import numpy as np
+
+SAWTOOTH_TEETH = 4
+FEW_UNIQUE_VALUES = 8
+ZIPF_EXPONENT = 1.5
+SPARSE_SPREAD = 16  # sparse values span this many times max(range, n)
+
+
+def uniform(rng, n, min_val, max_val):
+    return rng.integers(low=min_val, high=max_val + 1, size=n)
+
+
+def sorted_(rng, n, min_val, max_val):
+    return np.sort(uniform(rng, n, min_val, max_val))
+
+
+def reversed_(rng, n, min_val, max_val):
+    return sorted_(rng, n, min_val, max_val)[::-1].copy()
+
+
+def nearly_sorted(rng, n, min_val, max_val, swaps=None):
+    """Sorted data with `swaps` random pairs exchanged (default 1% of n)"""
+    a = sorted_(rng, n, min_val, max_val)
+    k = max(1, n // 100) if swaps is None else swaps
+    k = min(k, n // 2)
+    if k:
+        picked = rng.choice(n, size=2 * k, replace=False)
+        left, right = picked[:k], picked[k:]
+        a[left], a[right] = a[right], a[left]
+    return a
+
+
+def _ramp(position, length, min_val, max_val):
+    """Scale position in [0, length) linearly onto [min_val, max_val]"""
+    return min_val + position * (max_val - min_val) // max(length - 1, 1)
+
+
+def sawtooth(rng, n, min_val, max_val):
+    """SAWTOOTH_TEETH ascending runs, each covering the whole range"""
+    period = max(-(-n // SAWTOOTH_TEETH), 1)
+    return _ramp(np.arange(n, dtype=np.int64) % period, period, min_val, max_val)
+
+
+def organ_pipe(rng, n, min_val, max_val):
+    """Ascending to the middle, then descending"""
+    i = np.arange(n, dtype=np.int64)
+    half = (n + 1) // 2
+    return _ramp(np.minimum(i, n - 1 - i), half, min_val, max_val)
+
+
+def few_unique(rng, n, min_val, max_val):
+    values = uniform(rng, FEW_UNIQUE_VALUES, min_val, max_val)
+    return rng.choice(values, size=n)
+
+
+def zipf(rng, n, min_val, max_val):
+    """Heavily skewed towards min_val, with a long tail up to max_val"""
+    return min_val + np.minimum(rng.zipf(ZIPF_EXPONENT, size=n) - 1, max_val - min_val)
+
+
+def gaussian(rng, n, min_val, max_val):
+    mid = (min_val + max_val) / 2
+    values = rng.normal(mid, (max_val - min_val) / 6, size=n)
+    return np.clip(np.rint(values), min_val, max_val).astype(np.int64)
+
+
+def sparse(rng, n, min_val, max_val):
+    """Few values per unit of range, e.g. to exercise counting sort's sparse fallback"""
+    span = SPARSE_SPREAD * max(max_val - min_val, n)
+    return min_val + rng.integers(0, span + 1, size=n)
+
+
+WORKLOADS = {
+    'uniform': uniform,
+    'sorted': sorted_,
+    'reversed': reversed_,
+    'nearly_sorted': nearly_sorted,
+    'sawtooth': sawtooth,
+    'organ_pipe': organ_pipe,
+    'few_unique': few_unique,
+    'zipf': zipf,
+    'gaussian': gaussian,
+    'sparse': sparse,
+}
+
+WORKLOAD_NAMES = list(WORKLOADS)
+
+
+def make_array(name, n, min_val, max_val, seed=None):
+    """Generate workload `name` as an int64 ndarray"""
+    generator = WORKLOADS.get(name)
+    if generator is None:
+        raise ValueError(f"Unknown workload '{name}'. Choose from: {', '.join(WORKLOAD_NAMES)}")
+    rng = np.random.default_rng(seed)
+    return np.asarray(generator(rng, n, min_val, max_val), dtype=np.int64)
+
+
+def make(name, n, min_val, max_val, seed=None):
+    """Generate workload `name` as a list of Python ints"""
+    return make_array(name, n, min_val, max_val, seed).tolist()
+
+
+def next_workload(name):
+    """The workload after `name`, wrapping around; used by the UI key binding"""
+    return WORKLOAD_NAMES[(WORKLOAD_NAMES.index(name) + 1) % len(WORKLOAD_NAMES)]